@@ -6,14 +6,18 @@
 
 from typing import Dict, Any, List, Optional
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
 from matplotlib.figure import Figure
 from matplotlib.gridspec import GridSpec
 import numpy as np
 
 from ..base import BaseNode, NodeCategory, NodeType
 from ...common.exceptions import NodeExecutionError
+from .numeric_kernels import (
+    describe_columns, fast_corr, grouped_mean, rolling_mean, warm_up_kernels
+)
+from .render_utils import (
+    annotate_heatmap, downsample_indices, figure_width_pixels, plot_fast_kde
+)
 
 
 class DashboardNode(BaseNode):
@@ -43,15 +47,33 @@ class DashboardNode(BaseNode):
         # 输出端口
         self.add_output_port("figure", "Figure", "matplotlib图形对象")
         self.add_output_port("dashboard_info", "Dict", "仪表板信息")
+        
+        # 仪表板构建方法及其所需属性，在初始化时绑定一次
+        self._builders = {
+            "overview": (self._create_overview_dashboard,
+                         ("group_column", "figure_size", "show_statistics")),
+            "detailed": (self._create_detailed_dashboard,
+                         ("group_column", "figure_size")),
+            "comparison": (self._create_comparison_dashboard,
+                           ("group_column", "figure_size")),
+            "trends": (self._create_trends_dashboard,
+                       ("time_column", "group_column", "figure_size")),
+        }
     
     def execute(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
         """执行仪表板创建"""
         try:
+            import seaborn as sns
+            
             data = inputs.get("data")
             if data is None or data.empty:
                 raise NodeExecutionError("输入数据为空")
             
             dashboard_type = self.get_property("dashboard_type")
+            if dashboard_type not in self._builders:
+                raise NodeExecutionError(f"不支持的仪表板类型: {dashboard_type}")
+            builder, builder_args = self._builders[dashboard_type]
+            
             columns_to_analyze = self.get_property("columns_to_analyze")
             group_column = self.get_property("group_column")
             time_column = self.get_property("time_column")
@@ -59,27 +81,26 @@ class DashboardNode(BaseNode):
             color_palette = self.get_property("color_palette")
             show_statistics = self.get_property("show_statistics")
             
+            # 字符串分组列转换为分类类型，后续groupby/unique直接使用整数编码
+            if group_column and group_column in data.columns and data[group_column].dtype == object:
+                data = data.assign(**{group_column: data[group_column].astype("category")})
+            
+            # 数值列只扫描一次，供各仪表板自动选列使用
+            numeric_cols = data.select_dtypes(include=[np.number]).columns.tolist()
+            
             # 设置样式
             sns.set_style("whitegrid")
             sns.set_palette(color_palette)
             
             # 根据仪表板类型创建
-            if dashboard_type == "overview":
-                fig = self._create_overview_dashboard(data, columns_to_analyze, 
-                                                    group_column, figure_size, 
-                                                    show_statistics)
-            elif dashboard_type == "detailed":
-                fig = self._create_detailed_dashboard(data, columns_to_analyze,
-                                                    group_column, figure_size)
-            elif dashboard_type == "comparison":
-                fig = self._create_comparison_dashboard(data, columns_to_analyze,
-                                                      group_column, figure_size)
-            elif dashboard_type == "trends":
-                fig = self._create_trends_dashboard(data, columns_to_analyze,
-                                                   time_column, group_column, 
-                                                   figure_size)
-            else:
-                raise NodeExecutionError(f"不支持的仪表板类型: {dashboard_type}")
+            properties = {
+                "group_column": group_column,
+                "time_column": time_column,
+                "figure_size": figure_size,
+                "show_statistics": show_statistics
+            }
+            fig = builder(data, numeric_cols, columns_to_analyze,
+                          **{name: properties[name] for name in builder_args})
             
             dashboard_info = {
                 "dashboard_type": dashboard_type,
@@ -97,24 +118,25 @@ class DashboardNode(BaseNode):
         except Exception as e:
             raise NodeExecutionError(f"仪表板创建失败: {str(e)}")
     
-    def _create_overview_dashboard(self, data: pd.DataFrame, columns_to_analyze: List[str],
+    def _create_overview_dashboard(self, data: pd.DataFrame, numeric_cols: List[str],
+                                 columns_to_analyze: List[str],
                                  group_column: str, figure_size: list, 
                                  show_statistics: bool) -> Figure:
         """创建概览仪表板"""
+        import matplotlib.pyplot as plt
         # 如果未指定列，自动选择数值列
         if not columns_to_analyze:
-            numeric_cols = data.select_dtypes(include=[np.number]).columns.tolist()
             columns_to_analyze = numeric_cols[:4]  # 最多4列
         
         if not columns_to_analyze:
             raise NodeExecutionError("没有找到可分析的数值列")
         
         # 创建网格布局
-        fig = plt.figure(figsize=figure_size)
+        fig = plt.figure(figsize=figure_size, layout="constrained")
         gs = GridSpec(3, 4, figure=fig, hspace=0.3, wspace=0.3)
         
         # 顶部标题
-        fig.suptitle('Data Overview Dashboard', fontsize=20, y=0.95)
+        fig.suptitle('Data Overview Dashboard', fontsize=20)
         
         # 1. 数据概览统计表
         if show_statistics:
@@ -149,23 +171,24 @@ class DashboardNode(BaseNode):
             self._add_scatter_plot(ax_scatter, data, columns_to_analyze[0], 
                                  columns_to_analyze[1], group_column)
         
-        plt.tight_layout()
         return fig
     
-    def _create_detailed_dashboard(self, data: pd.DataFrame, columns_to_analyze: List[str],
+    def _create_detailed_dashboard(self, data: pd.DataFrame, numeric_cols: List[str],
+                                 columns_to_analyze: List[str],
                                  group_column: str, figure_size: list) -> Figure:
         """创建详细仪表板"""
+        import matplotlib.pyplot as plt
+        import scipy.stats as stats
         if not columns_to_analyze:
-            numeric_cols = data.select_dtypes(include=[np.number]).columns.tolist()
             columns_to_analyze = numeric_cols[:2]  # 选择前两列进行详细分析
         
         if not columns_to_analyze:
             raise NodeExecutionError("没有找到可分析的数值列")
         
-        fig = plt.figure(figsize=figure_size)
+        fig = plt.figure(figsize=figure_size, layout="constrained")
         gs = GridSpec(4, 4, figure=fig, hspace=0.4, wspace=0.3)
         
-        fig.suptitle('Detailed Analysis Dashboard', fontsize=20, y=0.95)
+        fig.suptitle('Detailed Analysis Dashboard', fontsize=20)
         
         col = columns_to_analyze[0]
         
@@ -183,8 +206,15 @@ class DashboardNode(BaseNode):
         
         # 第二行：QQ图和密度图
         ax_qq = fig.add_subplot(gs[1, :2])
-        from scipy.stats import probplot
-        probplot(data[col].dropna(), dist="norm", plot=ax_qq)
+        sample = np.sort(data[col].dropna().to_numpy(np.float64))
+        n = len(sample)
+        if n > 1:
+            theoretical = stats.norm.ppf((np.arange(1, n + 1) - 0.5) / n)
+            ax_qq.scatter(theoretical, sample, s=4)
+            slope, intercept = np.polyfit(theoretical, sample, 1)
+            ax_qq.plot(theoretical, slope * theoretical + intercept, 'r-')
+        ax_qq.set_xlabel('Theoretical quantiles')
+        ax_qq.set_ylabel('Ordered Values')
         ax_qq.set_title(f'Q-Q Plot of {col}')
         
         ax_kde = fig.add_subplot(gs[1, 2:])
@@ -192,15 +222,19 @@ class DashboardNode(BaseNode):
             for group in data[group_column].unique():
                 subset = data[data[group_column] == group][col].dropna()
                 if len(subset) > 0:
-                    sns.kdeplot(subset, ax=ax_kde, label=str(group))
+                    plot_fast_kde(ax_kde, subset, label=str(group))
             ax_kde.legend()
         else:
-            sns.kdeplot(data[col].dropna(), ax=ax_kde)
+            plot_fast_kde(ax_kde, data[col])
         ax_kde.set_title(f'Density Plot of {col}')
         
         # 第三行：时间序列（如果有索引）或累积分布
         ax_cumsum = fig.add_subplot(gs[2, :2])
-        data[col].cumsum().plot(ax=ax_cumsum)
+        values = data[col].to_numpy(np.float64)
+        # 与pandas cumsum一致：跳过NaN累加，NaN位置保持NaN
+        cumulative = np.nancumsum(values)
+        cumulative[np.isnan(values)] = np.nan
+        ax_cumsum.plot(data.index, cumulative)
         ax_cumsum.set_title(f'Cumulative Sum of {col}')
         
         ax_rolling = fig.add_subplot(gs[2, 2:])
@@ -211,12 +245,14 @@ class DashboardNode(BaseNode):
         ax_stats = fig.add_subplot(gs[3, :])
         self._add_detailed_statistics_table(ax_stats, data, col, group_column)
         
-        plt.tight_layout()
         return fig
     
-    def _create_comparison_dashboard(self, data: pd.DataFrame, columns_to_analyze: List[str],
+    def _create_comparison_dashboard(self, data: pd.DataFrame, numeric_cols: List[str],
+                                   columns_to_analyze: List[str],
                                    group_column: str, figure_size: list) -> Figure:
         """创建比较仪表板"""
+        import matplotlib.pyplot as plt
+        import seaborn as sns
         if not group_column or group_column not in data.columns:
             # 尝试找到合适的分组列
             categorical_cols = data.select_dtypes(include=['object', 'category']).columns
@@ -226,18 +262,17 @@ class DashboardNode(BaseNode):
                 raise NodeExecutionError("需要指定分组列进行比较")
         
         if not columns_to_analyze:
-            numeric_cols = data.select_dtypes(include=[np.number]).columns.tolist()
             columns_to_analyze = numeric_cols[:3]  # 最多3列
         
-        fig = plt.figure(figsize=figure_size)
+        fig = plt.figure(figsize=figure_size, layout="constrained")
         gs = GridSpec(3, 3, figure=fig, hspace=0.4, wspace=0.3)
         
-        fig.suptitle(f'Comparison Dashboard by {group_column}', fontsize=20, y=0.95)
+        fig.suptitle(f'Comparison Dashboard by {group_column}', fontsize=20)
         
         # 第一行：分组统计
         ax_bar = fig.add_subplot(gs[0, :])
         if columns_to_analyze:
-            grouped_means = data.groupby(group_column)[columns_to_analyze].mean()
+            grouped_means = grouped_mean(data, group_column, columns_to_analyze)
             grouped_means.plot(kind='bar', ax=ax_bar)
             ax_bar.set_title('Mean Values by Group')
             ax_bar.tick_params(axis='x', rotation=45)
@@ -251,17 +286,17 @@ class DashboardNode(BaseNode):
         # 第三行：热力图
         ax_heatmap = fig.add_subplot(gs[2, :])
         if columns_to_analyze:
-            pivot_data = data.groupby(group_column)[columns_to_analyze].mean()
-            sns.heatmap(pivot_data.T, annot=True, cmap='viridis', ax=ax_heatmap)
+            sns.heatmap(grouped_means.T, annot=True, cmap='viridis', ax=ax_heatmap)
             ax_heatmap.set_title('Mean Values Heatmap')
         
-        plt.tight_layout()
         return fig
     
-    def _create_trends_dashboard(self, data: pd.DataFrame, columns_to_analyze: List[str],
+    def _create_trends_dashboard(self, data: pd.DataFrame, numeric_cols: List[str],
+                               columns_to_analyze: List[str],
                                time_column: str, group_column: str, 
                                figure_size: list) -> Figure:
         """创建趋势仪表板"""
+        import matplotlib.pyplot as plt
         if not time_column or time_column not in data.columns:
             # 尝试找到时间列
             datetime_cols = data.select_dtypes(include=['datetime64']).columns
@@ -272,13 +307,12 @@ class DashboardNode(BaseNode):
                 time_column = None
         
         if not columns_to_analyze:
-            numeric_cols = data.select_dtypes(include=[np.number]).columns.tolist()
             columns_to_analyze = numeric_cols[:2]
         
-        fig = plt.figure(figsize=figure_size)
+        fig = plt.figure(figsize=figure_size, layout="constrained")
         gs = GridSpec(3, 2, figure=fig, hspace=0.4, wspace=0.3)
         
-        fig.suptitle('Trends Dashboard', fontsize=20, y=0.95)
+        fig.suptitle('Trends Dashboard', fontsize=20)
         
         # 准备时间数据
         if time_column:
@@ -288,10 +322,16 @@ class DashboardNode(BaseNode):
             x_data = data.index
             data_sorted = data
         
+        # 折线点数远超像素宽度时用LTTB降采样
+        x_values = np.asarray(x_data)
+        max_points = 2 * figure_width_pixels(fig)
+        
         # 第一行：主要趋势线
         ax_trend = fig.add_subplot(gs[0, :])
         for col in columns_to_analyze[:2]:
-            ax_trend.plot(x_data, data[col], label=col, marker='o', markersize=3)
+            y_values = data[col].to_numpy()
+            idx = downsample_indices(x_values, y_values, max_points)
+            ax_trend.plot(x_values[idx], y_values[idx], label=col, marker='o', markersize=3)
         ax_trend.set_title('Main Trends')
         ax_trend.legend()
         ax_trend.tick_params(axis='x', rotation=45)
@@ -302,16 +342,19 @@ class DashboardNode(BaseNode):
             
             ax_rolling = fig.add_subplot(gs[1, 0])
             window_size = max(1, len(data) // 20)
-            rolling_mean = data_sorted[col].rolling(window=window_size).mean()
-            ax_rolling.plot(x_data, data[col], alpha=0.3, label='Original')
-            ax_rolling.plot(x_data, rolling_mean, label=f'Rolling Mean ({window_size})', linewidth=2)
+            rolling_means = rolling_mean(data_sorted[col], window_size).to_numpy()
+            original = data[col].to_numpy()
+            idx = downsample_indices(x_values, original, max_points)
+            ax_rolling.plot(x_values[idx], original[idx], alpha=0.3, label='Original')
+            idx = downsample_indices(x_values, rolling_means, max_points)
+            ax_rolling.plot(x_values[idx], rolling_means[idx],
+                            label=f'Rolling Mean ({window_size})', linewidth=2)
             ax_rolling.set_title(f'Rolling Average: {col}')
             ax_rolling.legend()
             
             if group_column and group_column in data.columns:
                 ax_group = fig.add_subplot(gs[1, 1])
-                for group in data[group_column].unique():
-                    group_data = data[data[group_column] == group]
+                for group, group_data in data.groupby(group_column, sort=False, observed=True):
                     if time_column:
                         group_x = group_data[time_column]
                     else:
@@ -325,37 +368,55 @@ class DashboardNode(BaseNode):
             col = columns_to_analyze[0]
             
             ax_diff = fig.add_subplot(gs[2, 0])
-            diff_data = data_sorted[col].diff()
-            ax_diff.plot(x_data, diff_data, label='First Difference')
+            sorted_values = data_sorted[col].to_numpy(np.float64)
+            diff_data = np.empty_like(sorted_values)
+            diff_data[:1] = np.nan
+            diff_data[1:] = sorted_values[1:] - sorted_values[:-1]
+            idx = downsample_indices(x_values, diff_data, max_points)
+            ax_diff.plot(x_values[idx], diff_data[idx], label='First Difference')
             ax_diff.axhline(y=0, color='red', linestyle='--', alpha=0.7)
             ax_diff.set_title(f'Change Rate: {col}')
             ax_diff.legend()
             
             ax_autocorr = fig.add_subplot(gs[2, 1])
             # 简单的滞后相关性可视化
-            lags = range(1, min(20, len(data)//4))
-            autocorrs = [data[col].autocorr(lag) for lag in lags]
-            ax_autocorr.bar(lags, autocorrs)
+            lags = np.arange(1, min(20, len(data)//4))
+            if len(lags) > 0:
+                autocorrs = self._compute_autocorrelation(data[col], int(lags[-1]))[lags]
+                ax_autocorr.bar(lags, autocorrs)
             ax_autocorr.set_title(f'Autocorrelation: {col}')
             ax_autocorr.set_xlabel('Lag')
         
-        plt.tight_layout()
         return fig
     
+    def _compute_autocorrelation(self, series: pd.Series, max_lag: int) -> np.ndarray:
+        """基于FFT（Wiener–Khinchin）一次性计算0..max_lag阶自相关系数"""
+        x = series.to_numpy(dtype=np.float64)
+        x = x[~np.isnan(x)]
+        x -= x.mean()
+        n = len(x)
+        result = np.full(max_lag + 1, np.nan)
+        if n == 0:
+            return result
+        # 补零到2n避免循环相关
+        f = np.fft.rfft(x, n=2 * n)
+        acf = np.fft.irfft(f * np.conj(f), n=2 * n)
+        if acf[0] > 0:
+            m = min(n, max_lag + 1)
+            result[:m] = acf[:m] / acf[0]
+        return result
+
     def _add_statistics_table(self, ax, data: pd.DataFrame, columns: List[str]):
         """添加统计表"""
-        stats_data = []
-        for col in columns:
-            if col in data.columns:
-                col_data = data[col].dropna()
-                stats_data.append([
-                    col,
-                    f"{col_data.mean():.2f}",
-                    f"{col_data.std():.2f}",
-                    f"{col_data.min():.2f}",
-                    f"{col_data.max():.2f}",
-                    str(col_data.count())
-                ])
+        present_columns = [col for col in columns if col in data.columns]
+        described = describe_columns(data[present_columns].to_numpy(np.float64))
+        
+        # 向量化格式化：Mean/Std/Min/Max 与 Count
+        stats_data = np.column_stack([
+            np.array(present_columns, dtype=str),
+            np.char.mod("%.2f", described[:, [1, 2, 3, 7]]),
+            np.char.mod("%d", described[:, 0].astype(np.int64))
+        ]).tolist()
         
         table = ax.table(cellText=stats_data,
                         colLabels=['Column', 'Mean', 'Std', 'Min', 'Max', 'Count'],
@@ -370,18 +431,12 @@ class DashboardNode(BaseNode):
     def _add_detailed_statistics_table(self, ax, data: pd.DataFrame, col: str, group_column: str):
         """添加详细统计表"""
         col_data = data[col].dropna()
+        described = describe_columns(col_data.to_numpy(np.float64).reshape(-1, 1))[0]
         
-        # 基础统计
-        basic_stats = [
-            ['Count', str(col_data.count())],
-            ['Mean', f"{col_data.mean():.4f}"],
-            ['Std', f"{col_data.std():.4f}"],
-            ['Min', f"{col_data.min():.4f}"],
-            ['25%', f"{col_data.quantile(0.25):.4f}"],
-            ['50%', f"{col_data.quantile(0.50):.4f}"],
-            ['75%', f"{col_data.quantile(0.75):.4f}"],
-            ['Max', f"{col_data.max():.4f}"]
-        ]
+        # 基础统计（顺序与describe_columns输出一致）
+        values = [str(int(described[0]))] + np.char.mod("%.4f", described[1:]).tolist()
+        labels = ['Count', 'Mean', 'Std', 'Min', '25%', '50%', '75%', 'Max']
+        basic_stats = [[label, value] for label, value in zip(labels, values)]
         
         # 添加偏度和峰度
         try:
@@ -406,10 +461,12 @@ class DashboardNode(BaseNode):
     def _add_distribution_plot(self, ax, data: pd.DataFrame, col: str, group_column: str):
         """添加分布图"""
         if group_column and group_column in data.columns:
-            for group in data[group_column].unique():
-                subset = data[data[group_column] == group][col].dropna()
+            # 共享分箱边界，使各组直方图对齐
+            edges = np.histogram_bin_edges(data[col].dropna().to_numpy(), bins=15)
+            for group, subset in data.groupby(group_column, sort=False, observed=True)[col]:
+                subset = subset.dropna()
                 if len(subset) > 0:
-                    ax.hist(subset, alpha=0.6, label=str(group), bins=15)
+                    ax.hist(subset, alpha=0.6, label=str(group), bins=edges)
             ax.legend()
         else:
             ax.hist(data[col].dropna(), bins=20, alpha=0.7)
@@ -427,16 +484,17 @@ class DashboardNode(BaseNode):
     
     def _add_correlation_heatmap(self, ax, data: pd.DataFrame, columns: List[str]):
         """添加相关性热力图"""
+        import seaborn as sns
         if len(columns) > 1:
-            corr_data = data[columns].corr()
-            sns.heatmap(corr_data, annot=True, cmap='coolwarm', center=0, ax=ax)
+            corr_data = fast_corr(data[columns])
+            sns.heatmap(corr_data, annot=False, cmap='coolwarm', center=0, ax=ax)
+            annotate_heatmap(ax, corr_data)
         ax.set_title('Correlation Matrix')
     
     def _add_scatter_plot(self, ax, data: pd.DataFrame, x_col: str, y_col: str, group_column: str):
         """添加散点图"""
         if group_column and group_column in data.columns:
-            for group in data[group_column].unique():
-                subset = data[data[group_column] == group]
+            for group, subset in data.groupby(group_column, sort=False, observed=True):
                 ax.scatter(subset[x_col], subset[y_col], label=str(group), alpha=0.6)
             ax.legend()
         else:
@@ -454,4 +512,7 @@ class DashboardNode(BaseNode):
         if not isinstance(data, pd.DataFrame):
             return False
         
-        return not data.empty
\ No newline at end of file
+        return not data.empty
+
+
+warm_up_kernels()
@@ -6,13 +6,17 @@
 
 from typing import Dict, Any, List, Optional
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
 import numpy as np
 from matplotlib.figure import Figure
 
 from ..base import BaseNode, NodeCategory, NodeType
 from ...common.exceptions import NodeExecutionError
+from .numeric_kernels import fast_corr
+from .render_utils import annotate_heatmap
+
+
+# 矩阵热力图每个坐标轴最多显示的刻度标签数
+MAX_TICK_LABELS = 50
 
 
 class HeatmapNode(BaseNode):
@@ -65,23 +69,33 @@ class HeatmapNode(BaseNode):
             show_annotations = self.get_property("show_annotations")
             center_colormap = self.get_property("center_colormap")
             
+            # 字符串键列转换为分类类型，后续透视/计数直接使用整数编码
+            key_columns = [col for col in (index_column, columns_column)
+                           if col and col in data.columns and data[col].dtype == object]
+            if key_columns:
+                data = data.assign(**{col: data[col].astype("category") for col in key_columns})
+            
+            # 列类型只扫描一次，供各热力图自动选列使用
+            numeric_cols = data.select_dtypes(include=[np.number]).columns.tolist()
+            non_numeric_cols = data.columns.difference(numeric_cols, sort=False).tolist()
+            
             # 根据热力图类型处理数据
             if heatmap_type == "correlation":
                 heatmap_data, fig = self._create_correlation_heatmap(
-                    data, colormap, figure_size, show_annotations, center_colormap
+                    data, numeric_cols, colormap, figure_size, show_annotations, center_colormap
                 )
             elif heatmap_type == "pivot_table":
                 heatmap_data, fig = self._create_pivot_heatmap(
-                    data, index_column, columns_column, values_column, aggfunc,
+                    data, numeric_cols, non_numeric_cols, index_column, columns_column, values_column, aggfunc,
                     colormap, figure_size, show_annotations, center_colormap
                 )
             elif heatmap_type == "matrix":
                 heatmap_data, fig = self._create_matrix_heatmap(
-                    data, colormap, figure_size, show_annotations, center_colormap
+                    data, numeric_cols, colormap, figure_size, show_annotations, center_colormap
                 )
             elif heatmap_type == "confusion_matrix":
                 heatmap_data, fig = self._create_confusion_matrix_heatmap(
-                    data, index_column, columns_column,
+                    data, non_numeric_cols, index_column, columns_column,
                     colormap, figure_size, show_annotations
                 )
             else:
@@ -104,20 +118,24 @@ class HeatmapNode(BaseNode):
         except Exception as e:
             raise NodeExecutionError(f"热力图创建失败: {str(e)}")
     
-    def _create_correlation_heatmap(self, data: pd.DataFrame, colormap: str, 
-                                   figure_size: list, show_annotations: bool, 
+    def _create_correlation_heatmap(self, data: pd.DataFrame, numeric_cols: List[str],
+                                   colormap: str, figure_size: list, show_annotations: bool, 
                                    center_colormap: bool) -> tuple:
         """创建相关性热力图"""
+        import matplotlib.pyplot as plt
+        import seaborn as sns
         # 选择数值列
-        numeric_data = data.select_dtypes(include=[np.number])
+        if not numeric_cols:
+            raise NodeExecutionError("没有找到数值列")
+        numeric_data = data[numeric_cols]
         if numeric_data.empty:
             raise NodeExecutionError("没有找到数值列")
         
         # 计算相关矩阵
-        correlation_matrix = numeric_data.corr()
+        correlation_matrix = fast_corr(numeric_data)
         
         # 创建图形
-        fig, ax = plt.subplots(figsize=figure_size)
+        fig, ax = plt.subplots(figsize=figure_size, layout="constrained")
         
         # 绘制热力图
         sns.heatmap(
@@ -132,104 +150,156 @@ class HeatmapNode(BaseNode):
         )
         
         ax.set_title('Correlation Heatmap', fontsize=16, pad=20)
-        plt.tight_layout()
         
         return correlation_matrix, fig
     
-    def _create_pivot_heatmap(self, data: pd.DataFrame, index_column: str,
+    def _create_pivot_heatmap(self, data: pd.DataFrame, numeric_cols: List[str],
+                             non_numeric_cols: List[str], index_column: str,
                              columns_column: str, values_column: str, aggfunc: str,
                              colormap: str, figure_size: list, show_annotations: bool,
                              center_colormap: bool) -> tuple:
         """创建数据透视表热力图"""
+        import matplotlib.pyplot as plt
+        import seaborn as sns
         # 验证列名
         if not index_column or index_column not in data.columns:
-            non_numeric_cols = data.select_dtypes(exclude=[np.number]).columns
             if len(non_numeric_cols) == 0:
                 raise NodeExecutionError("没有找到适合作为行索引的列")
             index_column = non_numeric_cols[0]
         
         if not columns_column or columns_column not in data.columns:
-            available_cols = [col for col in data.columns if col != index_column]
-            non_numeric_cols = data[available_cols].select_dtypes(exclude=[np.number]).columns
-            if len(non_numeric_cols) == 0:
+            available_cols = [col for col in non_numeric_cols if col != index_column]
+            if len(available_cols) == 0:
                 raise NodeExecutionError("没有找到适合作为列索引的列")
-            columns_column = non_numeric_cols[0]
+            columns_column = available_cols[0]
         
         if not values_column or values_column not in data.columns:
-            numeric_cols = data.select_dtypes(include=[np.number]).columns
             if len(numeric_cols) == 0:
                 raise NodeExecutionError("没有找到数值列")
             values_column = numeric_cols[0]
         
         # 创建数据透视表
         try:
-            pivot_data = data.pivot_table(
-                values=values_column,
-                index=index_column,
-                columns=columns_column,
-                aggfunc=aggfunc,
-                fill_value=0
-            )
+            if aggfunc in ("mean", "sum", "count"):
+                pivot_data = self._bincount_pivot(data, index_column, columns_column,
+                                                  values_column, aggfunc)
+            else:
+                pivot_data = data.pivot_table(
+                    values=values_column,
+                    index=index_column,
+                    columns=columns_column,
+                    aggfunc=aggfunc,
+                    fill_value=0,
+                    observed=True
+                )
         except Exception as e:
             raise NodeExecutionError(f"创建数据透视表失败: {str(e)}")
         
         # 创建图形
-        fig, ax = plt.subplots(figsize=figure_size)
+        fig, ax = plt.subplots(figsize=figure_size, layout="constrained")
         
         # 绘制热力图
         sns.heatmap(
             pivot_data,
-            annot=show_annotations,
+            annot=False,
             cmap=colormap,
             center=0 if center_colormap else None,
             linewidths=0.5,
             cbar_kws={"shrink": 0.8},
             ax=ax
         )
+        if show_annotations:
+            annotate_heatmap(ax, pivot_data)
         
         ax.set_title(f'Pivot Table Heatmap: {values_column} by {index_column} and {columns_column}', 
                     fontsize=14, pad=20)
         plt.xticks(rotation=45)
         plt.yticks(rotation=0)
-        plt.tight_layout()
         
         return pivot_data, fig
     
-    def _create_matrix_heatmap(self, data: pd.DataFrame, colormap: str,
+    def _bincount_pivot(self, data: pd.DataFrame, index_column: str, columns_column: str,
+                        values_column: str, aggfunc: str) -> pd.DataFrame:
+        """基于np.bincount单次扫描构建mean/sum/count透视表，结果与pivot_table(fill_value=0)一致"""
+        row_codes, row_labels = pd.factorize(data[index_column], sort=True)
+        col_codes, col_labels = pd.factorize(data[columns_column], sort=True)
+        values = data[values_column].to_numpy(np.float64)
+        
+        # 忽略键或值缺失的记录
+        valid = (row_codes >= 0) & (col_codes >= 0) & ~np.isnan(values)
+        n_rows, n_cols = len(row_labels), len(col_labels)
+        flat_codes = row_codes[valid] * n_cols + col_codes[valid]
+        
+        counts = np.bincount(flat_codes, minlength=n_rows * n_cols).reshape(n_rows, n_cols)
+        if aggfunc == "count":
+            result = counts
+        else:
+            sums = np.bincount(flat_codes, weights=values[valid],
+                               minlength=n_rows * n_cols).reshape(n_rows, n_cols)
+            result = sums / np.where(counts == 0, 1, counts) if aggfunc == "mean" else sums
+        
+        pivot_data = pd.DataFrame(
+            result,
+            index=pd.Index(row_labels, name=index_column),
+            columns=pd.Index(col_labels, name=columns_column)
+        )
+        # pivot_table会丢弃没有任何有效值的行和列
+        return pivot_data.loc[counts.any(axis=1), counts.any(axis=0)]
+    
+    def _create_matrix_heatmap(self, data: pd.DataFrame, numeric_cols: List[str], colormap: str,
                               figure_size: list, show_annotations: bool,
                               center_colormap: bool) -> tuple:
         """创建矩阵热力图"""
+        import matplotlib.pyplot as plt
+        from matplotlib.colors import CenteredNorm
         # 选择数值数据
-        numeric_data = data.select_dtypes(include=[np.number])
+        if not numeric_cols:
+            raise NodeExecutionError("没有找到数值列")
+        numeric_data = data[numeric_cols]
         if numeric_data.empty:
             raise NodeExecutionError("没有找到数值列")
         
         # 创建图形
-        fig, ax = plt.subplots(figsize=figure_size)
+        fig, ax = plt.subplots(figsize=figure_size, layout="constrained")
         
-        # 绘制热力图
-        sns.heatmap(
-            numeric_data,
-            annot=show_annotations,
+        # 绘制热力图：大矩阵直接用栅格化的pcolormesh，导出PDF/SVG时只嵌入一张位图
+        n_rows, n_cols = numeric_data.shape
+        mesh = ax.pcolormesh(
+            np.arange(n_cols) + 0.5,
+            np.arange(n_rows) + 0.5,
+            np.ma.masked_invalid(numeric_data.to_numpy(np.float64)),
             cmap=colormap,
-            center=0 if center_colormap else None,
-            linewidths=0.1,
-            cbar_kws={"shrink": 0.8},
-            ax=ax
+            norm=CenteredNorm(vcenter=0) if center_colormap else None,
+            shading='nearest',
+            rasterized=True
         )
+        fig.colorbar(mesh, ax=ax, shrink=0.8)
+        
+        # 与seaborn一致：首行在上，刻度过密时抽稀
+        ax.invert_yaxis()
+        col_step = max(1, n_cols // MAX_TICK_LABELS)
+        row_step = max(1, n_rows // MAX_TICK_LABELS)
+        ax.set_xticks(np.arange(0, n_cols, col_step) + 0.5,
+                      [str(label) for label in numeric_data.columns[::col_step]], rotation=45)
+        ax.set_yticks(np.arange(0, n_rows, row_step) + 0.5,
+                      [str(label) for label in numeric_data.index[::row_step]])
+        
+        if show_annotations:
+            annotate_heatmap(ax, numeric_data)
         
         ax.set_title('Data Matrix Heatmap', fontsize=16, pad=20)
-        plt.tight_layout()
         
         return numeric_data, fig
     
-    def _create_confusion_matrix_heatmap(self, data: pd.DataFrame, actual_column: str,
+    def _create_confusion_matrix_heatmap(self, data: pd.DataFrame, non_numeric_cols: List[str],
+                                        actual_column: str,
                                         predicted_column: str, colormap: str,
                                         figure_size: list, show_annotations: bool) -> tuple:
         """创建混淆矩阵热力图"""
+        import matplotlib.pyplot as plt
+        import seaborn as sns
         # 验证列名
         if not actual_column or actual_column not in data.columns:
-            non_numeric_cols = data.select_dtypes(exclude=[np.number]).columns
             if len(non_numeric_cols) == 0:
                 raise NodeExecutionError("没有找到适合作为实际值的列")
             actual_column = non_numeric_cols[0]
@@ -241,14 +311,20 @@ class HeatmapNode(BaseNode):
             predicted_column = available_cols[0]
         
         # 创建混淆矩阵
-        confusion_matrix = pd.crosstab(
-            data[actual_column], 
-            data[predicted_column],
-            margins=False
+        actual_codes, actual_labels = pd.factorize(data[actual_column], sort=True)
+        predicted_codes, predicted_labels = pd.factorize(data[predicted_column], sort=True)
+        # 与crosstab一致，忽略缺失值
+        valid = (actual_codes >= 0) & (predicted_codes >= 0)
+        counts = np.zeros((len(actual_labels), len(predicted_labels)), dtype=np.int64)
+        np.add.at(counts, (actual_codes[valid], predicted_codes[valid]), 1)
+        confusion_matrix = pd.DataFrame(
+            counts,
+            index=pd.Index(actual_labels, name=actual_column),
+            columns=pd.Index(predicted_labels, name=predicted_column)
         )
         
         # 创建图形
-        fig, ax = plt.subplots(figsize=figure_size)
+        fig, ax = plt.subplots(figsize=figure_size, layout="constrained")
         
         # 绘制热力图
         sns.heatmap(
@@ -265,7 +341,6 @@ class HeatmapNode(BaseNode):
                     fontsize=14, pad=20)
         ax.set_xlabel(f'Predicted {predicted_column}')
         ax.set_ylabel(f'Actual {actual_column}')
-        plt.tight_layout()
         
         return confusion_matrix, fig
     
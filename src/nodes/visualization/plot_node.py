@@ -4,15 +4,54 @@
 提供高级绘图功能
 """
 
+import os
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, List, Optional, Union
 import pandas as pd
+import matplotlib
+
+# 节点只生成Figure对象，默认使用非交互式Agg后端，避免导入pyplot时探测GUI后端；
+# 可通过环境变量 DWA_MATPLOTLIB_BACKEND 指定其他后端，设为空字符串则保持matplotlib默认
+_backend = os.environ.get("DWA_MATPLOTLIB_BACKEND", "Agg")
+if _backend:
+    matplotlib.use(_backend, force=False)
+
 import matplotlib.pyplot as plt
 import seaborn as sns
 import numpy as np
 from matplotlib.figure import Figure
+from scipy.cluster.hierarchy import linkage, leaves_list
+from scipy.spatial.distance import squareform
 
 from ..base import BaseNode, NodeCategory, NodeType
 from ...common.exceptions import NodeExecutionError
+from .numeric_kernels import (
+    fast_corr, fft_kde_groups, ols_residuals, qq_points, split_by_category, warm_up_kernels
+)
+from .render_utils import downsample_frame
+
+
+# 大路径渲染加速：简化近似共线的顶点，并分块提交给Agg
+plt.rcParams['path.simplify'] = True
+plt.rcParams['path.simplify_threshold'] = 1.0
+plt.rcParams['agg.path.chunksize'] = 10000
+
+# 自带总标题的图表类型（需要为标题预留顶部边距）
+SUPTITLED_PLOT_TYPES = ("distribution", "correlation", "regression")
+
+# 直方图最大分箱数（'auto'规则在大样本下可能给出过多分箱）
+HIST_MAX_BINS = 200
+
+# 散点图矩阵：超过该行数时改用hexbin
+HEXBIN_MIN_ROWS = 10_000
+
+# 散点图矩阵：超过该行数时只显示相关系数文字网格
+SCATTER_MATRIX_MAX_ROWS = 1_000_000
+
+
+def _as_f32_c(df: pd.DataFrame) -> np.ndarray:
+    """将数值型DataFrame转换为C连续的float32数组（NaN保留）"""
+    return np.ascontiguousarray(df.to_numpy(dtype=np.float32, na_value=np.nan))
 
 
 class PlotNode(BaseNode):
@@ -36,6 +75,7 @@ class PlotNode(BaseNode):
         self.add_property("figure_size", [12, 8], list, "图表大小")
         self.add_property("color_palette", "viridis", str, "调色板")
         self.add_property("show_stats", True, bool, "显示统计信息")
+        self.add_property("max_heatmap_columns", 30, int, "相关性热力图最大列数（按方差取前K列）")
         
         # 输入端口
         self.add_input_port("data", "DataFrame", "输入数据")
@@ -59,6 +99,10 @@ class PlotNode(BaseNode):
             figure_size = self.get_property("figure_size")
             color_palette = self.get_property("color_palette")
             show_stats = self.get_property("show_stats")
+            max_heatmap_columns = self.get_property("max_heatmap_columns")
+            
+            # 数值列只扫描一次，传给各绘图方法
+            numeric_cols = data.select_dtypes(include=[np.number]).columns
             
             # 设置样式
             sns.set_style("whitegrid")
@@ -66,17 +110,17 @@ class PlotNode(BaseNode):
             
             # 根据图表类型绘制
             if plot_type == "distribution":
-                fig = self._create_distribution_plot(data, x_column, hue_column, figure_size)
+                fig = self._create_distribution_plot(data, numeric_cols, x_column, hue_column, figure_size)
             elif plot_type == "correlation":
-                fig = self._create_correlation_plot(data, figure_size)
+                fig = self._create_correlation_plot(data, numeric_cols, figure_size, max_heatmap_columns)
             elif plot_type == "regression":
-                fig = self._create_regression_plot(data, x_column, y_column, hue_column, figure_size)
+                fig = self._create_regression_plot(data, numeric_cols, x_column, y_column, hue_column, figure_size)
             elif plot_type == "violin":
-                fig = self._create_violin_plot(data, x_column, y_column, hue_column, figure_size)
+                fig = self._create_violin_plot(data, numeric_cols, x_column, y_column, hue_column, figure_size)
             elif plot_type == "swarm":
-                fig = self._create_swarm_plot(data, x_column, y_column, hue_column, figure_size)
+                fig = self._create_swarm_plot(data, numeric_cols, x_column, y_column, hue_column, figure_size)
             elif plot_type == "joint":
-                fig = self._create_joint_plot(data, x_column, y_column, figure_size)
+                fig = self._create_joint_plot(data, numeric_cols, x_column, y_column, figure_size)
             else:
                 raise NodeExecutionError(f"不支持的图表类型: {plot_type}")
             
@@ -84,7 +128,15 @@ class PlotNode(BaseNode):
             if title:
                 fig.suptitle(title, size=16, y=0.98)
             
-            plt.tight_layout()
+            # 子图网格形状固定，使用显式边距代替tight_layout，省去一次渲染测量
+            has_suptitle = bool(title) or plot_type in SUPTITLED_PLOT_TYPES
+            if plot_type == "joint":
+                # JointGrid自行管理边距，只为标题留出空间
+                if title:
+                    fig.subplots_adjust(top=0.93)
+            else:
+                fig.subplots_adjust(left=0.08, right=0.96, top=(0.93 if has_suptitle else 0.97),
+                                    bottom=0.08, wspace=0.25, hspace=0.3)
             
             plot_info = {
                 "plot_type": plot_type,
@@ -103,10 +155,9 @@ class PlotNode(BaseNode):
         except Exception as e:
             raise NodeExecutionError(f"绘图执行失败: {str(e)}")
     
-    def _create_distribution_plot(self, data: pd.DataFrame, x_column: str, hue_column: str, figure_size: list):
+    def _create_distribution_plot(self, data: pd.DataFrame, numeric_cols: pd.Index, x_column: str, hue_column: str, figure_size: list):
         """创建分布图"""
         if not x_column or x_column not in data.columns:
-            numeric_cols = data.select_dtypes(include=[np.number]).columns
             if len(numeric_cols) == 0:
                 raise NodeExecutionError("没有找到数值列")
             x_column = numeric_cols[0]
@@ -114,46 +165,95 @@ class PlotNode(BaseNode):
         fig, axes = plt.subplots(2, 2, figsize=figure_size)
         fig.suptitle(f'Distribution Analysis: {x_column}', size=16)
         
-        # 直方图
-        if hue_column and hue_column in data.columns:
-            sns.histplot(data=data, x=x_column, hue=hue_column, ax=axes[0,0], kde=True)
-        else:
-            sns.histplot(data=data, x=x_column, ax=axes[0,0], kde=True)
-        axes[0,0].set_title('Histogram with KDE')
-        
-        # 箱线图
+        # QQ与密度曲线的数值计算（scipy/numpy释放GIL）提交到线程池，
+        # 与主线程上的直方图、箱线图绘制重叠；所有matplotlib调用都留在主线程
+        # 只剔除一次缺失值，所有子图共用（保留分组列对齐）
+        clean = data.dropna(subset=[x_column])
+        values = clean[x_column].to_numpy()
         if hue_column and hue_column in data.columns:
-            sns.boxplot(data=data, x=hue_column, y=x_column, ax=axes[0,1])
+            kde_inputs = [(str(category), subset)
+                          for category, subset in split_by_category(values, clean[hue_column])]
         else:
-            sns.boxplot(data=data, y=x_column, ax=axes[0,1])
-        axes[0,1].set_title('Box Plot')
-        
-        # QQ图
-        from scipy.stats import probplot
-        probplot(data[x_column].dropna(), dist="norm", plot=axes[1,0])
-        axes[1,0].set_title('Q-Q Plot (Normal)')
+            kde_inputs = [(None, values)]
         
-        # 密度图
-        if hue_column and hue_column in data.columns:
-            for category in data[hue_column].unique():
-                subset = data[data[hue_column] == category][x_column].dropna()
-                if len(subset) > 0:
-                    sns.kdeplot(subset, ax=axes[1,1], label=str(category))
-            axes[1,1].legend()
-        else:
-            sns.kdeplot(data[x_column].dropna(), ax=axes[1,1])
-        axes[1,1].set_title('Density Plot')
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            qq_future = executor.submit(qq_points, values)
+            kde_future = executor.submit(fft_kde_groups, [subset for _, subset in kde_inputs])
+            
+            # 直方图：各分组共享分箱边界，np.histogram计数后用stairs绘制
+            edges = np.histogram_bin_edges(values, bins='auto')
+            if len(edges) > HIST_MAX_BINS + 1:
+                edges = np.histogram_bin_edges(values, bins=HIST_MAX_BINS)
+            bin_width = edges[1] - edges[0]
+            alpha = 0.5 if len(kde_inputs) > 1 else 0.7
+            for i, (label, subset) in enumerate(kde_inputs):
+                counts, _ = np.histogram(subset, bins=edges)
+                axes[0,0].stairs(counts, edges, fill=True, alpha=alpha, color=f'C{i}', label=label)
+            axes[0,0].set_xlabel(str(x_column))
+            axes[0,0].set_ylabel('Count')
+            axes[0,0].set_title('Histogram with KDE')
+            
+            # 箱线图
+            if hue_column and hue_column in data.columns:
+                sns.boxplot(data=clean, x=hue_column, y=x_column, ax=axes[0,1])
+            else:
+                sns.boxplot(data=clean, y=x_column, ax=axes[0,1])
+            axes[0,1].set_title('Box Plot')
+            
+            # QQ图
+            self._draw_qq(axes[1,0], *qq_future.result())
+            axes[1,0].set_title('Q-Q Plot (Normal)')
+            
+            # 密度图：所有分组在共享网格上，一次plot调用绘制；
+            # 同一曲线按 样本数×箱宽 缩放后叠加到直方图上
+            curves = kde_future.result()
+            if curves is not None:
+                grid, densities = curves
+                labels = [label for label, _ in kde_inputs]
+                sizes = np.array([len(subset) for _, subset in kde_inputs])
+                colors = [f'C{i}' for i in range(len(kde_inputs))]
+                axes[1,1].set_prop_cycle(color=colors)
+                axes[1,1].plot(grid, densities.T, label=labels)
+                axes[0,0].set_prop_cycle(color=colors)
+                axes[0,0].plot(grid, (densities * (sizes * bin_width)[:, None]).T)
+            axes[1,1].set_ylabel('Density')
+            if hue_column and hue_column in data.columns:
+                axes[0,0].legend()
+                axes[1,1].legend()
+            axes[1,1].set_title('Density Plot')
         
         return fig
     
-    def _create_correlation_plot(self, data: pd.DataFrame, figure_size: list):
+    def _draw_qq(self, ax, theoretical: np.ndarray, ordered: np.ndarray, slope: float, intercept: float):
+        """绘制Q-Q散点与四分位参考线"""
+        ax.scatter(theoretical, ordered, s=6, color='b')
+        if len(theoretical) > 0:
+            ends = theoretical[[0, -1]]
+            ax.plot(ends, slope * ends + intercept, 'r-')
+        ax.set_xlabel('Theoretical quantiles')
+        ax.set_ylabel('Ordered Values')
+    
+    def _create_correlation_plot(self, data: pd.DataFrame, numeric_cols: pd.Index, figure_size: list,
+                                 max_columns: int = 30):
         """创建相关性图"""
-        numeric_data = data.select_dtypes(include=[np.number])
+        numeric_data = data[numeric_cols]
         if numeric_data.empty:
             raise NodeExecutionError("没有找到数值列")
         
-        # 计算相关矩阵
-        corr_matrix = numeric_data.corr()
+        # 列数过多时热力图不可读，只保留方差最大的前K列，相关计算量由C²降为K²
+        if max_columns and numeric_data.shape[1] > max_columns:
+            top = numeric_data.var().nlargest(max_columns).index
+            numeric_data = numeric_data[top]
+        
+        # 计算相关矩阵（float64、按列对成对剔除缺失值，与 DataFrame.corr 一致）
+        corr_matrix = fast_corr(numeric_data)
+        
+        # 按层次聚类顺序排列变量（替代单独绘制后即关闭的clustermap）
+        if len(corr_matrix) > 2:
+            distance = (1 - corr_matrix.abs()).fillna(1.0).to_numpy()
+            np.fill_diagonal(distance, 0.0)
+            order = leaves_list(linkage(squareform(distance, checks=False), method='average'))
+            corr_matrix = corr_matrix.iloc[order, order]
         
         fig, axes = plt.subplots(1, 2, figsize=figure_size)
         fig.suptitle('Correlation Analysis', size=16)
@@ -163,28 +263,70 @@ class PlotNode(BaseNode):
                    square=True, ax=axes[0], cbar_kws={'shrink': 0.8})
         axes[0].set_title('Correlation Heatmap')
         
-        # 聚类图
-        sns.clustermap(corr_matrix, annot=True, cmap='coolwarm', center=0,
-                      square=True, figsize=(8, 8))
-        plt.close()  # 关闭clustermap自动创建的figure
-        
-        # 散点图矩阵（选择前几列）
-        if len(numeric_data.columns) <= 5:
-            scatter_data = numeric_data
+        # 散点图矩阵（选择前几列）；只有传给绘图的数组转换为float32
+        scatter_columns = numeric_data.columns[:5]
+        if len(numeric_data) > SCATTER_MATRIX_MAX_ROWS:
+            self._draw_correlation_grid(fig, axes[1], corr_matrix.loc[scatter_columns, scatter_columns])
         else:
-            scatter_data = numeric_data.iloc[:, :5]
-        
-        # 创建散点图矩阵
-        from pandas.plotting import scatter_matrix
-        scatter_matrix(scatter_data, ax=axes[1], alpha=0.6, figsize=(6, 6), diagonal='hist')
+            self._draw_scatter_matrix(fig, axes[1], _as_f32_c(numeric_data[scatter_columns]),
+                                      scatter_columns)
         axes[1].set_title('Scatter Matrix (Top 5 Variables)')
         
         return fig
     
-    def _create_regression_plot(self, data: pd.DataFrame, x_column: str, y_column: str, hue_column: str, figure_size: list):
+    def _draw_correlation_grid(self, fig, ax, corr: pd.DataFrame):
+        """数据量过大时代替散点图矩阵：只在网格中标注相关系数"""
+        k = len(corr)
+        ax.axis('off')
+        grid = ax.get_subplotspec().subgridspec(k, k, wspace=0.05, hspace=0.05)
+        for i, y_col in enumerate(corr.index):
+            for j, x_col in enumerate(corr.columns):
+                cell = fig.add_subplot(grid[i, j])
+                cell.set_xticks([])
+                cell.set_yticks([])
+                text = str(x_col) if i == j else f"{corr.iat[i, j]:.2f}"
+                cell.text(0.5, 0.5, text, ha='center', va='center', fontsize=8,
+                          transform=cell.transAxes)
+                if i == k - 1:
+                    cell.set_xlabel(str(x_col), fontsize=8)
+                if j == 0:
+                    cell.set_ylabel(str(y_col), fontsize=8)
+    
+    def _draw_scatter_matrix(self, fig, ax, values: np.ndarray, columns: pd.Index):
+        """在ax所占区域内绘制散点图矩阵，大数据量时改用hexbin"""
+        k = len(columns)
+        use_hexbin = len(values) > HEXBIN_MIN_ROWS
+        
+        ax.axis('off')
+        grid = ax.get_subplotspec().subgridspec(k, k, wspace=0.05, hspace=0.05)
+        for i, y_col in enumerate(columns):
+            y_values = values[:, i]
+            for j, x_col in enumerate(columns):
+                cell = fig.add_subplot(grid[i, j])
+                x_values = values[:, j]
+                if i == j:
+                    cell.hist(x_values[~np.isnan(x_values)], bins=20, alpha=0.6)
+                else:
+                    valid = ~(np.isnan(x_values) | np.isnan(y_values))
+                    if use_hexbin:
+                        cell.hexbin(x_values[valid], y_values[valid], gridsize=40, cmap='Blues')
+                    else:
+                        cell.scatter(x_values[valid], y_values[valid], s=4, alpha=0.4,
+                                     rasterized=True)
+                
+                # 只在外侧保留坐标标签
+                if i == k - 1:
+                    cell.set_xlabel(str(x_col), fontsize=8)
+                else:
+                    cell.set_xticks([])
+                if j == 0:
+                    cell.set_ylabel(str(y_col), fontsize=8)
+                else:
+                    cell.set_yticks([])
+                cell.tick_params(labelsize=6)
+    
+    def _create_regression_plot(self, data: pd.DataFrame, numeric_cols: pd.Index, x_column: str, y_column: str, hue_column: str, figure_size: list):
         """创建回归图"""
-        numeric_cols = data.select_dtypes(include=[np.number]).columns
-        
         if not x_column or x_column not in numeric_cols:
             x_column = numeric_cols[0] if len(numeric_cols) > 0 else None
         if not y_column or y_column not in numeric_cols:
@@ -196,23 +338,33 @@ class PlotNode(BaseNode):
         fig, axes = plt.subplots(2, 2, figsize=figure_size)
         fig.suptitle(f'Regression Analysis: {y_column} vs {x_column}', size=16)
         
-        # 散点图与回归线
+        clean_data = data[[x_column, y_column]].dropna()
+        if len(clean_data) > 1:
+            x_arr = clean_data[x_column].to_numpy(np.float64)
+            y_arr = clean_data[y_column].to_numpy(np.float64)
+            fitted, residuals = ols_residuals(x_arr, y_arr)
+        
+        # 散点图与回归线：大数据抽样后以栅格化散点绘制；抽样时不调用regplot拟合
+        # （也就不做置信区间的bootstrap），回归线改为基于全部数据的闭式拟合
+        plot_data = downsample_frame(data, hue_column)
+        sampled = len(plot_data) < len(data)
+        scatter_kws = {'rasterized': True, 's': 6}
         if hue_column and hue_column in data.columns:
-            sns.scatterplot(data=data, x=x_column, y=y_column, hue=hue_column, ax=axes[0,0])
-            sns.regplot(data=data, x=x_column, y=y_column, ax=axes[0,0], scatter=False)
+            sns.scatterplot(data=plot_data, x=x_column, y=y_column, hue=hue_column, ax=axes[0,0],
+                            rasterized=True, s=6)
+            if not sampled:
+                sns.regplot(data=plot_data, x=x_column, y=y_column, ax=axes[0,0], scatter=False)
         else:
-            sns.regplot(data=data, x=x_column, y=y_column, ax=axes[0,0])
+            sns.regplot(data=plot_data, x=x_column, y=y_column, ax=axes[0,0],
+                        fit_reg=not sampled, scatter_kws=scatter_kws)
+        if sampled and len(clean_data) > 1:
+            order = np.argsort(x_arr)
+            axes[0,0].plot(x_arr[order], fitted[order], color='C0', linewidth=2)
         axes[0,0].set_title('Scatter Plot with Regression Line')
         
         # 残差图
-        from sklearn.linear_model import LinearRegression
-        clean_data = data[[x_column, y_column]].dropna()
         if len(clean_data) > 1:
-            X = clean_data[[x_column]]
-            y = clean_data[y_column]
-            model = LinearRegression().fit(X, y)
-            residuals = y - model.predict(X)
-            axes[0,1].scatter(model.predict(X), residuals, alpha=0.6)
+            axes[0,1].scatter(fitted, residuals, alpha=0.6)
             axes[0,1].axhline(y=0, color='red', linestyle='--')
             axes[0,1].set_xlabel('Fitted Values')
             axes[0,1].set_ylabel('Residuals')
@@ -220,8 +372,7 @@ class PlotNode(BaseNode):
         
         # QQ图（残差）
         if len(clean_data) > 1:
-            from scipy.stats import probplot
-            probplot(residuals, dist="norm", plot=axes[1,0])
+            self._draw_qq(axes[1,0], *qq_points(residuals))
             axes[1,0].set_title('Q-Q Plot (Residuals)')
         
         # 残差直方图
@@ -233,10 +384,9 @@ class PlotNode(BaseNode):
         
         return fig
     
-    def _create_violin_plot(self, data: pd.DataFrame, x_column: str, y_column: str, hue_column: str, figure_size: list):
+    def _create_violin_plot(self, data: pd.DataFrame, numeric_cols: pd.Index, x_column: str, y_column: str, hue_column: str, figure_size: list):
         """创建小提琴图"""
         if not y_column or y_column not in data.columns:
-            numeric_cols = data.select_dtypes(include=[np.number]).columns
             if len(numeric_cols) == 0:
                 raise NodeExecutionError("没有找到数值列")
             y_column = numeric_cols[0]
@@ -252,14 +402,16 @@ class PlotNode(BaseNode):
         ax.set_title(f'Violin Plot: {y_column}')
         return fig
     
-    def _create_swarm_plot(self, data: pd.DataFrame, x_column: str, y_column: str, hue_column: str, figure_size: list):
+    def _create_swarm_plot(self, data: pd.DataFrame, numeric_cols: pd.Index, x_column: str, y_column: str, hue_column: str, figure_size: list):
         """创建蜂群图"""
         if not y_column or y_column not in data.columns:
-            numeric_cols = data.select_dtypes(include=[np.number]).columns
             if len(numeric_cols) == 0:
                 raise NodeExecutionError("没有找到数值列")
             y_column = numeric_cols[0]
         
+        # 蜂群图布局为O(N²)，超过上限时分层抽样
+        data = downsample_frame(data, hue_column or x_column)
+        
         fig, ax = plt.subplots(figsize=figure_size)
         
         if x_column and x_column in data.columns:
@@ -271,10 +423,8 @@ class PlotNode(BaseNode):
         ax.set_title(f'Swarm Plot: {y_column}')
         return fig
     
-    def _create_joint_plot(self, data: pd.DataFrame, x_column: str, y_column: str, figure_size: list):
+    def _create_joint_plot(self, data: pd.DataFrame, numeric_cols: pd.Index, x_column: str, y_column: str, figure_size: list):
         """创建联合图"""
-        numeric_cols = data.select_dtypes(include=[np.number]).columns
-        
         if not x_column or x_column not in numeric_cols:
             x_column = numeric_cols[0] if len(numeric_cols) > 0 else None
         if not y_column or y_column not in numeric_cols:
@@ -299,4 +449,7 @@ class PlotNode(BaseNode):
         if not isinstance(data, pd.DataFrame):
             return False
         
-        return not data.empty
\ No newline at end of file
+        return not data.empty
+
+
+warm_up_kernels()
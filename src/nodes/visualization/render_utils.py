@@ -0,0 +1,199 @@
+"""
+绘图渲染辅助
+
+为可视化节点提供减少matplotlib绘制开销的通用工具
+"""
+
+import numpy as np
+
+from .numeric_kernels import lttb_indices
+
+
+# 单元格数量超过该值时不再绘制数值标注
+MAX_ANNOTATED_CELLS = 2000
+
+# 每个标注至少需要的像素高度/宽度
+MIN_ANNOTATION_PIXELS = 12
+
+
+def annotate_heatmap(ax, values, fmt: str = ".2g",
+                     max_cells: int = MAX_ANNOTATED_CELLS) -> int:
+    """
+    为 sns.heatmap(annot=False) 绘制的热力图补充数值标注
+
+    只标注在当前图形尺寸下能容纳的行列，单元格过多时直接跳过，
+    避免为每个单元格创建大量Text对象。
+
+    Args:
+        ax: 已绘制热力图的坐标轴
+        values: 热力图数据（DataFrame或二维数组）
+        fmt: 数值格式
+        max_cells: 允许标注的最大单元格数
+
+    Returns:
+        实际绘制的标注数量
+    """
+    array = np.asarray(values)
+    if array.ndim != 2 or array.size == 0 or array.size > max_cells:
+        return 0
+
+    fig = ax.get_figure()
+    width_px, height_px = fig.get_size_inches() * fig.dpi
+    n_rows = min(array.shape[0], int(height_px // MIN_ANNOTATION_PIXELS))
+    n_cols = min(array.shape[1], int(width_px // MIN_ANNOTATION_PIXELS))
+
+    # 按单元格颜色亮度选择文字颜色，与seaborn保持一致
+    mesh = ax.collections[0] if ax.collections else None
+    annotated = 0
+    for (i, j), value in np.ndenumerate(array[:n_rows, :n_cols]):
+        if value is None or (isinstance(value, float) and np.isnan(value)):
+            continue
+        color = "black"
+        if mesh is not None:
+            r, g, b, _ = mesh.to_rgba(value)
+            if 0.2126 * r + 0.7152 * g + 0.0722 * b <= 0.408:
+                color = "white"
+        ax.text(j + 0.5, i + 0.5, format(value, fmt),
+                ha="center", va="center", color=color, fontsize=8)
+        annotated += 1
+    return annotated
+
+
+def _as_numeric_axis(x: np.ndarray) -> np.ndarray:
+    """将横坐标转换为float64，无法转换时使用位置序号"""
+    if np.issubdtype(x.dtype, np.datetime64):
+        x = x.astype("datetime64[ns]")
+        numeric = x.astype(np.int64).astype(np.float64)
+        numeric[np.isnat(x)] = np.nan
+        return numeric
+    if np.issubdtype(x.dtype, np.number):
+        return x.astype(np.float64)
+    return np.arange(len(x), dtype=np.float64)
+
+
+def downsample_indices(x, y, n_out: int):
+    """
+    为折线图选取降采样下标
+
+    点数不超过2*n_out时返回slice(None)（不降采样）；否则剔除NaN后
+    用LTTB保留n_out个点。
+
+    Args:
+        x: 横坐标
+        y: 纵坐标
+        n_out: 目标点数，通常取图形宽度像素数的2倍
+
+    Returns:
+        可直接用于索引x、y数组的下标
+    """
+    x = np.asarray(x)
+    y = np.asarray(y, dtype=np.float64)
+    if len(y) <= 2 * n_out:
+        return slice(None)
+
+    x_numeric = _as_numeric_axis(x)
+    valid = np.flatnonzero(np.isfinite(x_numeric) & np.isfinite(y))
+    return valid[lttb_indices(x_numeric[valid], y[valid], n_out)]
+
+
+def figure_width_pixels(fig) -> int:
+    """返回图形宽度（像素）"""
+    return int(fig.get_size_inches()[0] * fig.dpi)
+
+
+# KDE最大采样点数与求值网格点数
+KDE_MAX_SAMPLES = 20000
+KDE_GRID_POINTS = 256
+
+
+def compute_kde_curve(values, n_sample: int = KDE_MAX_SAMPLES,
+                      n_grid: int = KDE_GRID_POINTS):
+    """
+    在固定网格上计算高斯核密度曲线（纯数值计算，可在工作线程中执行）
+
+    样本量超过n_sample时先做无放回随机抽样（固定随机种子），
+    对密度曲线形状几乎没有影响。
+
+    Args:
+        values: 一维样本（NaN会被忽略）
+        n_sample: 最大采样点数
+        n_grid: 求值网格点数
+
+    Returns:
+        (grid, density) 元组；样本不足或方差为0时返回None
+    """
+    from scipy.stats import gaussian_kde
+
+    x = np.asarray(values, dtype=np.float64)
+    x = x[~np.isnan(x)]
+    if len(x) < 2:
+        return None
+    if len(x) > n_sample:
+        x = np.random.default_rng(0).choice(x, n_sample, replace=False)
+
+    try:
+        kde = gaussian_kde(x)
+    except np.linalg.LinAlgError:
+        return None
+
+    # 与seaborn一致，网格向两侧延伸3倍带宽
+    pad = 3 * kde.factor * x.std(ddof=1)
+    grid = np.linspace(x.min() - pad, x.max() + pad, n_grid)
+    return grid, kde(grid)
+
+
+def plot_fast_kde(ax, values, label=None, n_sample: int = KDE_MAX_SAMPLES,
+                  n_grid: int = KDE_GRID_POINTS, **plot_kwargs) -> bool:
+    """
+    在固定网格上绘制高斯核密度曲线，替代 sns.kdeplot
+
+    Args:
+        ax: 目标坐标轴
+        values: 一维样本（NaN会被忽略）
+        label: 图例标签
+        n_sample: 最大采样点数
+        n_grid: 求值网格点数
+
+    Returns:
+        是否成功绘制（样本不足或方差为0时返回False）
+    """
+    curve = compute_kde_curve(values, n_sample, n_grid)
+    if curve is None:
+        return False
+    ax.plot(*curve, label=label, **plot_kwargs)
+    ax.set_ylabel('Density')
+    return True
+
+
+# 交给seaborn绘制散点/蜂群图的最大点数
+SCATTER_MAX_POINTS = 5000
+
+
+def downsample_frame(df, stratify_column=None, cap: int = SCATTER_MAX_POINTS):
+    """
+    行数超过cap时随机抽样（固定随机种子），可按分组列分层
+
+    分层时每组最多保留 cap // 分组数 行，保证小分组不会在抽样中消失。
+
+    Args:
+        df: 输入DataFrame
+        stratify_column: 分层列名，为空或不存在时做简单随机抽样
+        cap: 最大行数
+
+    Returns:
+        抽样后的DataFrame（保持原行顺序），未超过cap时原样返回
+    """
+    if len(df) <= cap:
+        return df
+
+    # 按行位置抽样并排序位置，索引无序或有重复时也保持原行顺序
+    rng = np.random.default_rng(0)
+    if not stratify_column or stratify_column not in df.columns:
+        return df.iloc[np.sort(rng.choice(len(df), size=cap, replace=False))]
+
+    n_groups = max(1, df[stratify_column].nunique())
+    per_group = max(1, cap // n_groups)
+    order = rng.permutation(len(df))
+    shuffled = df.iloc[order]
+    keep = shuffled.groupby(stratify_column, sort=False, observed=True).cumcount().to_numpy() < per_group
+    return df.iloc[np.sort(order[keep])]
@@ -4,15 +4,121 @@
 提供专业统计图表功能
 """
 
+from functools import lru_cache
 from typing import Dict, Any, List, Optional
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
 import numpy as np
 from matplotlib.figure import Figure
+from matplotlib.transforms import offset_copy
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 
 from ..base import BaseNode, NodeCategory, NodeType
 from ...common.exceptions import NodeExecutionError
+from .numeric_kernels import (
+    cooks_distance, durbin_watson, ols_residuals, regression_diagnostics
+)
+
+
+# scipy.stats 在首次执行时才导入，未使用该节点的工作流不承担其导入开销
+scipy_stats = None
+
+
+def _ensure_stats_libs() -> None:
+    """首次调用时导入scipy.stats并缓存为模块级全局变量"""
+    global scipy_stats
+    if scipy_stats is None:
+        from scipy import stats
+        scipy_stats = stats
+
+
+def _f32(values: np.ndarray) -> np.ndarray:
+    """仅供绘图的数组转为float32（统计量仍以float64计算），减少传给Agg的数据量"""
+    return np.asarray(values).astype(np.float32, copy=False)
+
+
+def _clean_xy(data: pd.DataFrame, columns: list) -> np.ndarray:
+    """将指定列提取为float64二维数组并剔除含缺失值的行；数据无缺失时不经过dropna"""
+    subset = data[columns]
+    arr = subset.to_numpy(dtype=np.float64, copy=False)
+    if not np.isnan(arr).any():
+        return arr
+    return subset.dropna().to_numpy(dtype=np.float64, copy=False)
+
+
+# 样本量超过该值时用Anderson-Darling代替Shapiro-Wilk
+SHAPIRO_MAX_SAMPLES = 500
+
+
+# 样本量不超过该值时才缓存理论分位数与排序结果，限制模块级缓存常驻的内存
+# （每个数组至多约80KB）
+STATS_CACHE_MAX_N = 10_000
+
+
+def _compute_theoretical_quantiles(dist_name: str, n: int) -> np.ndarray:
+    """计算理论分位数 ppf((i-0.5)/n)"""
+    _ensure_stats_libs()
+    dist = getattr(scipy_stats, dist_name)
+    return dist.ppf((np.arange(1, n + 1) - 0.5) / n)
+
+
+@lru_cache(maxsize=64)
+def _theoretical_quantiles_cached(dist_name: str, n: int) -> np.ndarray:
+    """按 (分布, 样本量) 缓存理论分位数"""
+    quantiles = _compute_theoretical_quantiles(dist_name, n)
+    # 缓存的数组被多次共享，禁止原地修改
+    quantiles.flags.writeable = False
+    return quantiles
+
+
+def _theoretical_quantiles(dist_name: str, n: int) -> np.ndarray:
+    """理论分位数；小样本按 (分布, 样本量) 缓存，重复绘制同样本量的QQ图时免去ppf计算"""
+    if n <= STATS_CACHE_MAX_N:
+        return _theoretical_quantiles_cached(dist_name, n)
+    return _compute_theoretical_quantiles(dist_name, n)
+
+
+# 超过该字节数的样本不进入排序缓存（tobytes与哈希本身也是O(n)），
+# 与理论分位数缓存使用相同的样本量上限
+SORT_CACHE_MAX_BYTES = STATS_CACHE_MAX_N * 8
+
+
+@lru_cache(maxsize=8)
+def _sorted_stats_cached(arr_bytes: bytes) -> tuple:
+    """按样本内容缓存 (排序数组, 均值, 样本标准差)"""
+    sorted_arr = np.sort(np.frombuffer(arr_bytes, dtype=np.float64))
+    sorted_arr.flags.writeable = False
+    return sorted_arr, sorted_arr.mean(), sorted_arr.std(ddof=1)
+
+
+def _sorted_stats(values: np.ndarray) -> tuple:
+    """返回 (排序数组, 均值, 样本标准差)，QQ图与PP图对同一样本共用一次排序"""
+    values = np.ascontiguousarray(values, dtype=np.float64)
+    if values.nbytes <= SORT_CACHE_MAX_BYTES:
+        return _sorted_stats_cached(values.tobytes())
+    sorted_arr = np.sort(values)
+    return sorted_arr, sorted_arr.mean(), sorted_arr.std(ddof=1)
+
+
+# 杠杆图/影响图最多标注的点数
+MAX_LABELED_POINTS = 5
+
+
+def _label_top_points(ax, scores: np.ndarray, threshold: float,
+                      x: np.ndarray, y: np.ndarray, k: int = MAX_LABELED_POINTS) -> None:
+    """
+    用ax.text标注超过阈值且得分最高的至多k个点（标签为行号）
+
+    argpartition为O(n)选取；ax.text不经过annotate的箭头与xytext处理，
+    偏移量通过一次offset_copy变换统一实现。
+    """
+    candidates = np.flatnonzero(scores > threshold)
+    if len(candidates) == 0:
+        return
+    if len(candidates) > k:
+        candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+    transform = offset_copy(ax.transData, fig=ax.figure, x=5, y=5, units='points')
+    for idx in candidates:
+        ax.text(x[idx], y[idx], str(int(idx)), fontsize=8, transform=transform)
 
 
 class StatisticalPlotsNode(BaseNode):
@@ -50,8 +156,10 @@ class StatisticalPlotsNode(BaseNode):
     def execute(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
         """执行统计图表创建"""
         try:
+            _ensure_stats_libs()
+            
             data = inputs.get("data")
-            if data is None or data.empty:
+            if data is None or len(data.index) == 0:
                 raise NodeExecutionError("输入数据为空")
             
             plot_type = self.get_property("plot_type")
@@ -63,23 +171,37 @@ class StatisticalPlotsNode(BaseNode):
             figure_size = self.get_property("figure_size")
             confidence_interval = self.get_property("confidence_interval")
             
-            # 根据图表类型创建
-            if plot_type == "qq_plot":
-                fig, stats = self._create_qq_plot(data, y_column, distribution, figure_size)
-            elif plot_type == "pp_plot":
-                fig, stats = self._create_pp_plot(data, y_column, distribution, figure_size)
-            elif plot_type == "residual_plot":
-                fig, stats = self._create_residual_plot(data, predicted_column, residual_column, 
-                                                      x_column, y_column, figure_size)
-            elif plot_type == "leverage_plot":
-                fig, stats = self._create_leverage_plot(data, x_column, y_column, figure_size)
-            elif plot_type == "influence_plot":
-                fig, stats = self._create_influence_plot(data, x_column, y_column, figure_size)
-            elif plot_type == "scale_location_plot":
-                fig, stats = self._create_scale_location_plot(data, predicted_column, 
-                                                            residual_column, figure_size)
-            elif plot_type == "diagnostic_plots":
-                fig, stats = self._create_diagnostic_plots(data, x_column, y_column, figure_size)
+            # 解析列名后一次性提取为连续的float64数组，各绘图方法只接收数组
+            if plot_type in ("qq_plot", "pp_plot"):
+                y_column = self._resolve_column(data, y_column)
+                values = _clean_xy(data, [y_column])[:, 0]
+                if plot_type == "qq_plot":
+                    fig, stats = self._create_qq_plot(values, y_column, distribution, figure_size)
+                else:
+                    fig, stats = self._create_pp_plot(values, y_column, distribution, figure_size)
+            elif plot_type in ("residual_plot", "scale_location_plot"):
+                if predicted_column in data.columns and residual_column in data.columns:
+                    predicted, residuals = self._xy_arrays(data, predicted_column, residual_column)
+                else:
+                    # 没有预测值和残差列时，用简单线性回归计算
+                    x_column, y_column = self._resolve_xy(data, x_column, y_column)
+                    x_arr, y_arr = self._xy_arrays(data, x_column, y_column)
+                    if len(x_arr) < 2:
+                        raise NodeExecutionError("数据点不足，无法进行回归分析")
+                    predicted, residuals = self._regression_residuals(x_arr, y_arr)
+                if plot_type == "residual_plot":
+                    fig, stats = self._create_residual_plot(predicted, residuals, figure_size)
+                else:
+                    fig, stats = self._create_scale_location_plot(predicted, residuals, figure_size)
+            elif plot_type in ("leverage_plot", "influence_plot", "diagnostic_plots"):
+                x_column, y_column = self._resolve_xy(data, x_column, y_column)
+                x_arr, y_arr = self._xy_arrays(data, x_column, y_column)
+                if plot_type == "leverage_plot":
+                    fig, stats = self._create_leverage_plot(x_arr, y_arr, figure_size)
+                elif plot_type == "influence_plot":
+                    fig, stats = self._create_influence_plot(x_arr, y_arr, figure_size)
+                else:
+                    fig, stats = self._create_diagnostic_plots(x_arr, y_arr, figure_size)
             else:
                 raise NodeExecutionError(f"不支持的图表类型: {plot_type}")
             
@@ -100,17 +222,90 @@ class StatisticalPlotsNode(BaseNode):
         except Exception as e:
             raise NodeExecutionError(f"统计图表创建失败: {str(e)}")
     
-    def _create_qq_plot(self, data: pd.DataFrame, column: str, distribution: str, 
+    def _new_figure(self, figure_size: list, nrows: int = 1, ncols: int = 1):
+        """
+        新建Figure及子图，返回 (Figure, Axes)
+
+        Figure直接构造并绑定FigureCanvasAgg，不注册到pyplot的全局图形管理器，
+        并行执行时互不干扰；每次执行都输出独立的Figure。
+        """
+        fig = Figure(figsize=figure_size)
+        FigureCanvasAgg(fig)
+        return fig, fig.subplots(nrows, ncols, squeeze=True)
+    
+    def _resolve_column(self, data: pd.DataFrame, column: str) -> str:
+        """列名无效时回退到第一个数值列"""
+        if column and column in data.columns:
+            return column
+        numeric_cols = data.select_dtypes(include=[np.number]).columns
+        if len(numeric_cols) == 0:
+            raise NodeExecutionError("没有找到数值列")
+        return numeric_cols[0]
+    
+    def _resolve_xy(self, data: pd.DataFrame, x_column: str, y_column: str) -> tuple:
+        """X/Y列名无效时回退到前两个数值列"""
+        if x_column and y_column and x_column in data.columns and y_column in data.columns:
+            return x_column, y_column
+        numeric_cols = data.select_dtypes(include=[np.number]).columns
+        if len(numeric_cols) < 2:
+            raise NodeExecutionError("需要至少两个数值列")
+        return numeric_cols[0], numeric_cols[1]
+    
+    def _xy_arrays(self, data: pd.DataFrame, x_column: str, y_column: str) -> tuple:
+        """剔除缺失值后将两列提取为float64数组"""
+        x_arr, y_arr = _clean_xy(data, [x_column, y_column]).T
+        return np.ascontiguousarray(x_arr), np.ascontiguousarray(y_arr)
+    
+    def _regression_residuals(self, x_arr: np.ndarray, y_arr: np.ndarray) -> tuple:
+        """简单线性回归（闭式解），返回 (预测值, 残差)"""
+        return ols_residuals(x_arr, y_arr)
+    
+    def _regression_diagnostics(self, x_arr: np.ndarray, y_arr: np.ndarray) -> dict:
+        """一次性计算回归诊断所需的全部数组：系数、预测值、残差、标准化残差、杠杆值与R²"""
+        (predicted, residuals, std_residuals, leverages,
+         slope, intercept, r_squared) = regression_diagnostics(x_arr, y_arr)
+        return {
+            'slope': slope,
+            'intercept': intercept,
+            'predicted': predicted,
+            'residuals': residuals,
+            'std_residuals': std_residuals,
+            'leverages': leverages,
+            'r_squared': r_squared,
+            'n_params': 2
+        }
+    
+    def _draw_residuals_vs_fitted(self, ax, predicted: np.ndarray, residuals: np.ndarray):
+        """绘制残差vs拟合值"""
+        ax.scatter(_f32(predicted), _f32(residuals), alpha=0.6)
+        ax.axhline(y=0, color='red', linestyle='--')
+        ax.set_xlabel('Fitted Values')
+        ax.set_ylabel('Residuals')
+        ax.set_title('Residuals vs Fitted')
+        ax.grid(True, alpha=0.3)
+    
+    def _draw_scale_location(self, ax, predicted: np.ndarray, std_residuals: np.ndarray) -> np.ndarray:
+        """绘制Scale-Location散点，返回√|标准化残差|"""
+        sqrt_abs_residuals = np.sqrt(np.abs(std_residuals))
+        ax.scatter(_f32(predicted), _f32(sqrt_abs_residuals), alpha=0.6)
+        ax.set_xlabel('Fitted Values')
+        ax.set_ylabel('√|Standardized Residuals|')
+        ax.grid(True, alpha=0.3)
+        return sqrt_abs_residuals
+    
+    def _draw_leverage(self, ax, leverages: np.ndarray, std_residuals: np.ndarray):
+        """绘制标准化残差vs杠杆值"""
+        ax.scatter(_f32(leverages), _f32(std_residuals), alpha=0.6)
+        ax.set_xlabel('Leverage')
+        ax.set_ylabel('Standardized Residuals')
+        ax.grid(True, alpha=0.3)
+        
+        # 添加参考线
+        ax.axhline(y=0, color='red', linestyle='--', alpha=0.7)
+    
+    def _create_qq_plot(self, values: np.ndarray, column: str, distribution: str, 
                        figure_size: list) -> tuple:
         """创建QQ图"""
-        if not column or column not in data.columns:
-            numeric_cols = data.select_dtypes(include=[np.number]).columns
-            if len(numeric_cols) == 0:
-                raise NodeExecutionError("没有找到数值列")
-            column = numeric_cols[0]
-        
-        from scipy import stats as scipy_stats
-        
         # 获取分布对象
         dist_map = {
             'norm': scipy_stats.norm,
@@ -123,25 +318,21 @@ class StatisticalPlotsNode(BaseNode):
         if distribution not in dist_map:
             distribution = 'norm'
         
-        dist_obj = dist_map[distribution]
-        
-        fig, ax = plt.subplots(figsize=figure_size)
-        
-        # 清理数据
-        clean_data = data[column].dropna()
+        fig, ax = self._new_figure(figure_size)
         
         # 创建QQ图
-        scipy_stats.probplot(clean_data, dist=dist_obj, plot=ax)
+        self._plot_qq(ax, values, distribution)
         ax.set_title(f'Q-Q Plot: {column} vs {distribution.title()} Distribution')
         ax.grid(True, alpha=0.3)
         
         # 计算相关统计量
         stats_results = {}
         
-        # Shapiro-Wilk正态性检验（仅对正态分布）
-        if distribution == 'norm' and len(clean_data) <= 5000:
+        # 正态性检验（仅对正态分布）：小样本用Shapiro-Wilk，
+        # 大样本改用计算量更小的Anderson-Darling（只需一次排序）
+        if distribution == 'norm' and len(values) <= SHAPIRO_MAX_SAMPLES:
             try:
-                shapiro_stat, shapiro_p = scipy_stats.shapiro(clean_data)
+                shapiro_stat, shapiro_p = scipy_stats.shapiro(values)
                 stats_results['shapiro_wilk'] = {
                     'statistic': shapiro_stat,
                     'p_value': shapiro_p,
@@ -149,14 +340,27 @@ class StatisticalPlotsNode(BaseNode):
                 }
             except Exception:
                 pass
+        elif distribution == 'norm':
+            try:
+                anderson = scipy_stats.anderson(values, dist='norm')
+                # 取5%显著性水平对应的临界值
+                level_index = list(anderson.significance_level).index(5.0)
+                critical_value = anderson.critical_values[level_index]
+                stats_results['anderson_darling'] = {
+                    'statistic': anderson.statistic,
+                    'critical_value_5pct': critical_value,
+                    'interpretation': 'Normal' if anderson.statistic < critical_value else 'Not Normal'
+                }
+            except Exception:
+                pass
         
         # Kolmogorov-Smirnov检验
         try:
             if distribution == 'norm':
-                ks_stat, ks_p = scipy_stats.kstest(clean_data, 'norm', 
-                                                  args=(clean_data.mean(), clean_data.std()))
+                ks_stat, ks_p = scipy_stats.kstest(values, 'norm', 
+                                                  args=(values.mean(), values.std(ddof=1)))
             else:
-                ks_stat, ks_p = scipy_stats.kstest(clean_data, distribution)
+                ks_stat, ks_p = scipy_stats.kstest(values, distribution)
             
             stats_results['kolmogorov_smirnov'] = {
                 'statistic': ks_stat,
@@ -167,44 +371,48 @@ class StatisticalPlotsNode(BaseNode):
             pass
         
         # 添加统计信息到图表
-        info_text = f"Sample size: {len(clean_data)}\n"
+        info_text = f"Sample size: {len(values)}\n"
         if 'shapiro_wilk' in stats_results:
             info_text += f"Shapiro-Wilk p-value: {stats_results['shapiro_wilk']['p_value']:.4f}\n"
+        if 'anderson_darling' in stats_results:
+            info_text += (f"Anderson-Darling: {stats_results['anderson_darling']['statistic']:.4f} "
+                          f"(5% crit {stats_results['anderson_darling']['critical_value_5pct']:.4f})\n")
         if 'kolmogorov_smirnov' in stats_results:
             info_text += f"K-S p-value: {stats_results['kolmogorov_smirnov']['p_value']:.4f}"
         
         ax.text(0.05, 0.95, info_text, transform=ax.transAxes, 
                verticalalignment='top', bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.5))
         
-        plt.tight_layout()
+        fig.tight_layout()
         return fig, stats_results
     
-    def _create_pp_plot(self, data: pd.DataFrame, column: str, distribution: str, 
+    def _plot_qq(self, ax, values: np.ndarray, distribution: str = 'norm'):
+        """绘制QQ图：缓存的理论分位数 vs 排序样本，并叠加最小二乘拟合线"""
+        osm = _theoretical_quantiles(distribution, len(values))
+        osr, _, _ = _sorted_stats(values)
+        ax.scatter(_f32(osm), _f32(osr), s=12, color='b')
+        if len(values) > 1:
+            slope, intercept = np.polyfit(osm, osr, 1)
+            ax.plot(osm[[0, -1]], slope * osm[[0, -1]] + intercept, 'r-')
+        ax.set_xlabel('Theoretical quantiles')
+        ax.set_ylabel('Ordered Values')
+    
+    def _create_pp_plot(self, values: np.ndarray, column: str, distribution: str, 
                        figure_size: list) -> tuple:
         """创建PP图"""
-        if not column or column not in data.columns:
-            numeric_cols = data.select_dtypes(include=[np.number]).columns
-            if len(numeric_cols) == 0:
-                raise NodeExecutionError("没有找到数值列")
-            column = numeric_cols[0]
-        
-        from scipy import stats as scipy_stats
-        
-        fig, ax = plt.subplots(figsize=figure_size)
-        
-        clean_data = data[column].dropna()
+        fig, ax = self._new_figure(figure_size)
         
         # 计算经验累积分布函数
-        n = len(clean_data)
-        sorted_data = np.sort(clean_data)
-        empirical_cdf = np.arange(1, n + 1) / n
+        n = len(values)
+        sorted_data, mean, std = _sorted_stats(values)
+        empirical_cdf = np.linspace(1 / n, 1, n)
         
-        # 计算理论累积分布函数
+        # 计算理论累积分布函数；正态分布先标准化再直接调用ndtr，跳过分布对象的参数校验
         if distribution == 'norm':
-            mean, std = clean_data.mean(), clean_data.std()
-            theoretical_cdf = scipy_stats.norm.cdf(sorted_data, mean, std)
+            from scipy.special import ndtr
+            theoretical_cdf = ndtr((sorted_data - mean) / std)
         elif distribution == 'uniform':
-            min_val, max_val = clean_data.min(), clean_data.max()
+            min_val, max_val = sorted_data[0], sorted_data[-1]
             theoretical_cdf = scipy_stats.uniform.cdf(sorted_data, min_val, max_val - min_val)
         else:
             # 使用默认参数
@@ -212,7 +420,7 @@ class StatisticalPlotsNode(BaseNode):
             theoretical_cdf = dist_obj.cdf(sorted_data)
         
         # 绘制PP图
-        ax.scatter(theoretical_cdf, empirical_cdf, alpha=0.6)
+        ax.scatter(_f32(theoretical_cdf), _f32(empirical_cdf), alpha=0.6)
         ax.plot([0, 1], [0, 1], 'r--', label='Perfect Fit')
         ax.set_xlabel(f'Theoretical Cumulative Probability ({distribution})')
         ax.set_ylabel('Empirical Cumulative Probability')
@@ -220,92 +428,56 @@ class StatisticalPlotsNode(BaseNode):
         ax.legend()
         ax.grid(True, alpha=0.3)
         
-        # 计算相关统计量
-        correlation = np.corrcoef(theoretical_cdf, empirical_cdf)[0, 1]
+        # 计算相关统计量（直接按协方差/标准差之积计算，免去corrcoef构造2×2矩阵）
+        cov = (theoretical_cdf * empirical_cdf).mean() - theoretical_cdf.mean() * empirical_cdf.mean()
+        correlation = cov / (theoretical_cdf.std() * empirical_cdf.std())
         rmse = np.sqrt(np.mean((theoretical_cdf - empirical_cdf) ** 2))
         
         stats_results = {
             'correlation': correlation,
             'rmse': rmse,
-            'sample_size': len(clean_data)
+            'sample_size': n
         }
         
         # 添加统计信息
-        info_text = f"Correlation: {correlation:.4f}\nRMSE: {rmse:.4f}\nSample size: {len(clean_data)}"
+        info_text = f"Correlation: {correlation:.4f}\nRMSE: {rmse:.4f}\nSample size: {n}"
         ax.text(0.05, 0.95, info_text, transform=ax.transAxes, 
                verticalalignment='top', bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.5))
         
-        plt.tight_layout()
+        fig.tight_layout()
         return fig, stats_results
     
-    def _create_residual_plot(self, data: pd.DataFrame, predicted_column: str, 
-                             residual_column: str, x_column: str, y_column: str, 
+    def _create_residual_plot(self, predicted: np.ndarray, residuals: np.ndarray, 
                              figure_size: list) -> tuple:
         """创建残差图"""
-        fig, axes = plt.subplots(2, 2, figsize=figure_size)
+        fig, axes = self._new_figure(figure_size, 2, 2)
         fig.suptitle('Residual Analysis', fontsize=16)
         
-        # 如果没有预测值和残差，尝试计算
-        if (not predicted_column or predicted_column not in data.columns or
-            not residual_column or residual_column not in data.columns):
-            
-            if not x_column or not y_column or x_column not in data.columns or y_column not in data.columns:
-                numeric_cols = data.select_dtypes(include=[np.number]).columns
-                if len(numeric_cols) < 2:
-                    raise NodeExecutionError("需要至少两个数值列进行回归分析")
-                x_column = numeric_cols[0]
-                y_column = numeric_cols[1]
-            
-            # 简单线性回归
-            from sklearn.linear_model import LinearRegression
-            clean_data = data[[x_column, y_column]].dropna()
-            X = clean_data[[x_column]]
-            y = clean_data[y_column]
-            
-            if len(clean_data) < 2:
-                raise NodeExecutionError("数据点不足，无法进行回归分析")
-            
-            model = LinearRegression().fit(X, y)
-            predicted = model.predict(X)
-            residuals = y - predicted
-        else:
-            clean_data = data[[predicted_column, residual_column]].dropna()
-            predicted = clean_data[predicted_column]
-            residuals = clean_data[residual_column]
-        
         # 1. 残差vs拟合值
-        axes[0, 0].scatter(predicted, residuals, alpha=0.6)
-        axes[0, 0].axhline(y=0, color='red', linestyle='--')
-        axes[0, 0].set_xlabel('Fitted Values')
-        axes[0, 0].set_ylabel('Residuals')
-        axes[0, 0].set_title('Residuals vs Fitted')
-        axes[0, 0].grid(True, alpha=0.3)
+        self._draw_residuals_vs_fitted(axes[0, 0], predicted, residuals)
         
         # 2. 残差的QQ图
-        from scipy.stats import probplot
-        probplot(residuals, dist="norm", plot=axes[0, 1])
+        self._plot_qq(axes[0, 1], residuals)
         axes[0, 1].set_title('Normal Q-Q Plot (Residuals)')
         
-        # 3. 标准化残差的直方图
-        std_residuals = residuals / residuals.std()
-        axes[1, 0].hist(std_residuals, bins=20, alpha=0.7, edgecolor='black')
+        # 3. 标准化残差的直方图：np.histogram计数后用bar一次绘制
+        std_residuals = residuals / residuals.std(ddof=1)
+        counts, edges = np.histogram(std_residuals, bins=20)
+        axes[1, 0].bar(edges[:-1], counts, width=np.diff(edges), align='edge',
+                       alpha=0.7, edgecolor='black')
         axes[1, 0].set_xlabel('Standardized Residuals')
         axes[1, 0].set_ylabel('Frequency')
         axes[1, 0].set_title('Residuals Histogram')
         axes[1, 0].grid(True, alpha=0.3)
         
         # 4. Scale-Location图
-        sqrt_abs_residuals = np.sqrt(np.abs(std_residuals))
-        axes[1, 1].scatter(predicted, sqrt_abs_residuals, alpha=0.6)
-        axes[1, 1].set_xlabel('Fitted Values')
-        axes[1, 1].set_ylabel('√|Standardized Residuals|')
+        self._draw_scale_location(axes[1, 1], predicted, std_residuals)
         axes[1, 1].set_title('Scale-Location Plot')
-        axes[1, 1].grid(True, alpha=0.3)
         
         # 计算统计量
         stats_results = {
             'residual_mean': residuals.mean(),
-            'residual_std': residuals.std(),
+            'residual_std': residuals.std(ddof=1),
             'residual_min': residuals.min(),
             'residual_max': residuals.max(),
             'n_observations': len(residuals)
@@ -313,78 +485,40 @@ class StatisticalPlotsNode(BaseNode):
         
         # Durbin-Watson统计量（自相关检验）
         try:
-            dw_stat = np.sum(np.diff(residuals)**2) / np.sum(residuals**2)
+            dw_stat = durbin_watson(residuals)
             stats_results['durbin_watson'] = dw_stat
         except Exception:
             pass
         
-        plt.tight_layout()
+        fig.tight_layout()
         return fig, stats_results
     
-    def _create_leverage_plot(self, data: pd.DataFrame, x_column: str, y_column: str, 
+    def _create_leverage_plot(self, x_arr: np.ndarray, y_arr: np.ndarray, 
                              figure_size: list) -> tuple:
         """创建杠杆图"""
-        if not x_column or not y_column or x_column not in data.columns or y_column not in data.columns:
-            numeric_cols = data.select_dtypes(include=[np.number]).columns
-            if len(numeric_cols) < 2:
-                raise NodeExecutionError("需要至少两个数值列")
-            x_column = numeric_cols[0]
-            y_column = numeric_cols[1]
-        
-        fig, ax = plt.subplots(figsize=figure_size)
-        
-        clean_data = data[[x_column, y_column]].dropna()
-        X = clean_data[[x_column]]
-        y = clean_data[y_column]
-        
-        if len(clean_data) < 3:
+        if len(x_arr) < 3:
             raise NodeExecutionError("数据点不足，无法计算杠杆值")
         
-        # 计算杠杆值（hat values）
-        from sklearn.linear_model import LinearRegression
-        model = LinearRegression().fit(X, y)
+        fig, ax = self._new_figure(figure_size)
         
-        # 添加常数项
-        X_with_const = np.column_stack([np.ones(len(X)), X])
-        
-        # 计算帽子矩阵的对角元素（杠杆值）
-        try:
-            H = X_with_const @ np.linalg.inv(X_with_const.T @ X_with_const) @ X_with_const.T
-            leverages = np.diag(H)
-        except np.linalg.LinAlgError:
-            # 如果矩阵奇异，使用伪逆
-            H = X_with_const @ np.linalg.pinv(X_with_const.T @ X_with_const) @ X_with_const.T
-            leverages = np.diag(H)
-        
-        # 计算残差
-        predicted = model.predict(X)
-        residuals = y - predicted
-        std_residuals = residuals / residuals.std()
+        diagnostics = self._regression_diagnostics(x_arr, y_arr)
+        leverages = diagnostics['leverages']
+        std_residuals = diagnostics['std_residuals']
         
         # 绘制杠杆图
-        ax.scatter(leverages, std_residuals, alpha=0.6)
-        ax.set_xlabel('Leverage')
-        ax.set_ylabel('Standardized Residuals')
+        self._draw_leverage(ax, leverages, std_residuals)
         ax.set_title('Leverage Plot')
-        ax.grid(True, alpha=0.3)
-        
-        # 添加参考线
-        ax.axhline(y=0, color='red', linestyle='--', alpha=0.7)
         
         # 高杠杆点阈值
-        p = X_with_const.shape[1]  # 参数个数
-        n = len(clean_data)
+        p = diagnostics['n_params']  # 参数个数
+        n = len(x_arr)
         leverage_threshold = 2 * p / n
         ax.axvline(x=leverage_threshold, color='orange', linestyle='--', alpha=0.7, 
                   label=f'Leverage Threshold ({leverage_threshold:.3f})')
         
-        # 标记高杠杆点
+        # 标记杠杆值最高的高杠杆点
         high_leverage = leverages > leverage_threshold
-        if np.any(high_leverage):
-            high_lev_indices = np.where(high_leverage)[0]
-            for idx in high_lev_indices[:5]:  # 最多标记5个点
-                ax.annotate(f'{idx}', (leverages[idx], std_residuals.iloc[idx]), 
-                           xytext=(5, 5), textcoords='offset points', fontsize=8)
+        _label_top_points(ax, leverages, leverage_threshold, leverages, std_residuals)
         
         ax.legend()
         
@@ -393,58 +527,32 @@ class StatisticalPlotsNode(BaseNode):
             'leverage_max': leverages.max(),
             'leverage_threshold': leverage_threshold,
             'high_leverage_count': np.sum(high_leverage),
-            'n_observations': len(clean_data)
+            'n_observations': n
         }
         
-        plt.tight_layout()
+        fig.tight_layout()
         return fig, stats_results
     
-    def _create_influence_plot(self, data: pd.DataFrame, x_column: str, y_column: str, 
+    def _create_influence_plot(self, x_arr: np.ndarray, y_arr: np.ndarray, 
                               figure_size: list) -> tuple:
         """创建影响图"""
-        if not x_column or not y_column or x_column not in data.columns or y_column not in data.columns:
-            numeric_cols = data.select_dtypes(include=[np.number]).columns
-            if len(numeric_cols) < 2:
-                raise NodeExecutionError("需要至少两个数值列")
-            x_column = numeric_cols[0]
-            y_column = numeric_cols[1]
-        
-        fig, ax = plt.subplots(figsize=figure_size)
-        
-        clean_data = data[[x_column, y_column]].dropna()
-        X = clean_data[[x_column]]
-        y = clean_data[y_column]
-        
-        if len(clean_data) < 3:
+        if len(x_arr) < 3:
             raise NodeExecutionError("数据点不足，无法计算影响值")
         
-        from sklearn.linear_model import LinearRegression
-        model = LinearRegression().fit(X, y)
-        
-        # 计算Cook's Distance
-        predicted = model.predict(X)
-        residuals = y - predicted
-        
-        # 添加常数项计算杠杆值
-        X_with_const = np.column_stack([np.ones(len(X)), X])
-        try:
-            H = X_with_const @ np.linalg.inv(X_with_const.T @ X_with_const) @ X_with_const.T
-            leverages = np.diag(H)
-        except np.linalg.LinAlgError:
-            H = X_with_const @ np.linalg.pinv(X_with_const.T @ X_with_const) @ X_with_const.T
-            leverages = np.diag(H)
+        diagnostics = self._regression_diagnostics(x_arr, y_arr)
+        residuals = diagnostics['residuals']
+        leverages = diagnostics['leverages']
+        std_residuals = diagnostics['std_residuals']
         
         # 计算Cook's Distance
         mse = np.mean(residuals**2)
-        p = X_with_const.shape[1]
+        cooks_d = cooks_distance(residuals, leverages, diagnostics['n_params'], mse)
         
-        cooks_d = (residuals**2 / (p * mse)) * (leverages / (1 - leverages)**2)
-        
-        # 标准化残差
-        std_residuals = residuals / residuals.std()
+        fig, ax = self._new_figure(figure_size)
         
         # 创建气泡图，气泡大小表示Cook's Distance
-        scatter = ax.scatter(leverages, std_residuals, s=cooks_d*1000, alpha=0.6, c=cooks_d, cmap='Reds')
+        scatter = ax.scatter(_f32(leverages), _f32(std_residuals), s=cooks_d * 1000,
+                             alpha=0.6, c=cooks_d, cmap='Reds')
         
         ax.set_xlabel('Leverage')
         ax.set_ylabel('Standardized Residuals')
@@ -452,191 +560,120 @@ class StatisticalPlotsNode(BaseNode):
         ax.grid(True, alpha=0.3)
         
         # 添加颜色条
-        cbar = plt.colorbar(scatter, ax=ax)
+        cbar = fig.colorbar(scatter, ax=ax)
         cbar.set_label('Cook\'s Distance')
         
         # 添加参考线
         ax.axhline(y=0, color='red', linestyle='--', alpha=0.7)
         
         # Cook's Distance阈值
-        cooks_threshold = 4 / len(clean_data)
+        cooks_threshold = 4 / len(x_arr)
         
-        # 标记高影响点
+        # 标记Cook's Distance最大的高影响点
         high_influence = cooks_d > cooks_threshold
-        if np.any(high_influence):
-            high_inf_indices = np.where(high_influence)[0]
-            for idx in high_inf_indices[:5]:  # 最多标记5个点
-                ax.annotate(f'{idx}', (leverages[idx], std_residuals.iloc[idx]), 
-                           xytext=(5, 5), textcoords='offset points', fontsize=8)
+        _label_top_points(ax, cooks_d, cooks_threshold, leverages, std_residuals)
         
         stats_results = {
             'cooks_d_mean': cooks_d.mean(),
             'cooks_d_max': cooks_d.max(),
             'cooks_threshold': cooks_threshold,
             'high_influence_count': np.sum(high_influence),
-            'n_observations': len(clean_data)
+            'n_observations': len(x_arr)
         }
         
-        plt.tight_layout()
+        fig.tight_layout()
         return fig, stats_results
     
-    def _create_scale_location_plot(self, data: pd.DataFrame, predicted_column: str, 
-                                   residual_column: str, figure_size: list) -> tuple:
+    def _create_scale_location_plot(self, predicted: np.ndarray, residuals: np.ndarray, 
+                                   figure_size: list) -> tuple:
         """创建Scale-Location图"""
-        # 如果没有预测值和残差列，使用前两个数值列进行回归
-        if (not predicted_column or predicted_column not in data.columns or
-            not residual_column or residual_column not in data.columns):
-            
-            numeric_cols = data.select_dtypes(include=[np.number]).columns
-            if len(numeric_cols) < 2:
-                raise NodeExecutionError("需要至少两个数值列")
-            
-            x_column = numeric_cols[0]
-            y_column = numeric_cols[1]
-            
-            from sklearn.linear_model import LinearRegression
-            clean_data = data[[x_column, y_column]].dropna()
-            X = clean_data[[x_column]]
-            y = clean_data[y_column]
-            
-            model = LinearRegression().fit(X, y)
-            predicted = model.predict(X)
-            residuals = y - predicted
-        else:
-            clean_data = data[[predicted_column, residual_column]].dropna()
-            predicted = clean_data[predicted_column]
-            residuals = clean_data[residual_column]
-        
-        fig, ax = plt.subplots(figsize=figure_size)
+        fig, ax = self._new_figure(figure_size)
         
         # 标准化残差
-        std_residuals = residuals / residuals.std()
-        
-        # 计算√|标准化残差|
-        sqrt_abs_std_residuals = np.sqrt(np.abs(std_residuals))
+        std_residuals = residuals / residuals.std(ddof=1)
         
         # 绘制Scale-Location图
-        ax.scatter(predicted, sqrt_abs_std_residuals, alpha=0.6)
+        sqrt_abs_std_residuals = self._draw_scale_location(ax, predicted, std_residuals)
         
-        # 添加平滑曲线
-        try:
-            from scipy.interpolate import UnivariateSpline
+        # 添加平滑曲线：按拟合值排序后做滑动平均（窗口约为样本量的2%）
+        n = len(predicted)
+        window = min(n, max(5, n // 50))
+        if n >= 2:
             sorted_indices = np.argsort(predicted)
-            spline = UnivariateSpline(predicted.iloc[sorted_indices], 
-                                    sqrt_abs_std_residuals.iloc[sorted_indices], s=0.3)
-            x_smooth = np.linspace(predicted.min(), predicted.max(), 100)
-            y_smooth = spline(x_smooth)
-            ax.plot(x_smooth, y_smooth, 'red', linewidth=2, label='Smooth Line')
+            xs = predicted[sorted_indices]
+            ys = sqrt_abs_std_residuals[sorted_indices]
+            y_smooth = np.convolve(ys, np.ones(window) / window, mode='valid')
+            start = (window - 1) // 2
+            ax.plot(xs[start:start + len(y_smooth)], y_smooth, 'red', linewidth=2, label='Smooth Line')
             ax.legend()
-        except Exception:
-            pass
         
-        ax.set_xlabel('Fitted Values')
-        ax.set_ylabel('√|Standardized Residuals|')
         ax.set_title('Scale-Location Plot')
-        ax.grid(True, alpha=0.3)
         
         # 计算统计量
         stats_results = {
             'sqrt_residuals_mean': sqrt_abs_std_residuals.mean(),
-            'sqrt_residuals_std': sqrt_abs_std_residuals.std(),
-            'homoscedasticity_score': 1 - (sqrt_abs_std_residuals.std() / sqrt_abs_std_residuals.mean()),
+            'sqrt_residuals_std': sqrt_abs_std_residuals.std(ddof=1),
+            'homoscedasticity_score': 1 - (sqrt_abs_std_residuals.std(ddof=1) / sqrt_abs_std_residuals.mean()),
             'n_observations': len(residuals)
         }
         
-        plt.tight_layout()
+        fig.tight_layout()
         return fig, stats_results
     
-    def _create_diagnostic_plots(self, data: pd.DataFrame, x_column: str, y_column: str, 
+    def _create_diagnostic_plots(self, x_arr: np.ndarray, y_arr: np.ndarray, 
                                 figure_size: list) -> tuple:
         """创建综合诊断图"""
-        if not x_column or not y_column or x_column not in data.columns or y_column not in data.columns:
-            numeric_cols = data.select_dtypes(include=[np.number]).columns
-            if len(numeric_cols) < 2:
-                raise NodeExecutionError("需要至少两个数值列")
-            x_column = numeric_cols[0]
-            y_column = numeric_cols[1]
-        
-        fig, axes = plt.subplots(2, 2, figsize=figure_size)
-        fig.suptitle('Regression Diagnostic Plots', fontsize=16)
-        
-        clean_data = data[[x_column, y_column]].dropna()
-        X = clean_data[[x_column]]
-        y = clean_data[y_column]
-        
-        if len(clean_data) < 3:
+        if len(x_arr) < 3:
             raise NodeExecutionError("数据点不足，无法进行诊断分析")
         
-        from sklearn.linear_model import LinearRegression
-        model = LinearRegression().fit(X, y)
-        predicted = model.predict(X)
-        residuals = y - predicted
-        std_residuals = residuals / residuals.std()
+        fig, axes = self._new_figure(figure_size, 2, 2)
+        fig.suptitle('Regression Diagnostic Plots', fontsize=16)
+        
+        # 预测值、残差、标准化残差与杠杆值只计算一次，四个子图共用
+        diagnostics = self._regression_diagnostics(x_arr, y_arr)
+        predicted = diagnostics['predicted']
+        residuals = diagnostics['residuals']
+        std_residuals = diagnostics['std_residuals']
+        leverages = diagnostics['leverages']
         
         # 1. 残差vs拟合值
-        axes[0, 0].scatter(predicted, residuals, alpha=0.6)
-        axes[0, 0].axhline(y=0, color='red', linestyle='--')
-        axes[0, 0].set_xlabel('Fitted Values')
-        axes[0, 0].set_ylabel('Residuals')
-        axes[0, 0].set_title('Residuals vs Fitted')
-        axes[0, 0].grid(True, alpha=0.3)
+        self._draw_residuals_vs_fitted(axes[0, 0], predicted, residuals)
         
         # 2. 残差的QQ图
-        from scipy.stats import probplot
-        probplot(residuals, dist="norm", plot=axes[0, 1])
+        self._plot_qq(axes[0, 1], residuals)
         axes[0, 1].set_title('Normal Q-Q Plot')
         
         # 3. Scale-Location图
-        sqrt_abs_residuals = np.sqrt(np.abs(std_residuals))
-        axes[1, 0].scatter(predicted, sqrt_abs_residuals, alpha=0.6)
-        axes[1, 0].set_xlabel('Fitted Values')
-        axes[1, 0].set_ylabel('√|Standardized Residuals|')
+        self._draw_scale_location(axes[1, 0], predicted, std_residuals)
         axes[1, 0].set_title('Scale-Location')
-        axes[1, 0].grid(True, alpha=0.3)
         
         # 4. 杠杆图
-        X_with_const = np.column_stack([np.ones(len(X)), X])
-        try:
-            H = X_with_const @ np.linalg.inv(X_with_const.T @ X_with_const) @ X_with_const.T
-            leverages = np.diag(H)
-        except np.linalg.LinAlgError:
-            H = X_with_const @ np.linalg.pinv(X_with_const.T @ X_with_const) @ X_with_const.T
-            leverages = np.diag(H)
-        
-        axes[1, 1].scatter(leverages, std_residuals, alpha=0.6)
-        axes[1, 1].set_xlabel('Leverage')
-        axes[1, 1].set_ylabel('Standardized Residuals')
+        self._draw_leverage(axes[1, 1], leverages, std_residuals)
         axes[1, 1].set_title('Residuals vs Leverage')
-        axes[1, 1].grid(True, alpha=0.3)
-        
-        # 添加参考线
-        axes[1, 1].axhline(y=0, color='red', linestyle='--', alpha=0.7)
         
         # 计算综合统计量
         stats_results = {
-            'r_squared': model.score(X, y),
-            'residual_std': residuals.std(),
+            'r_squared': diagnostics['r_squared'],
+            'residual_std': residuals.std(ddof=1),
             'leverage_mean': leverages.mean(),
             'leverage_max': leverages.max(),
-            'n_observations': len(clean_data)
+            'n_observations': len(x_arr)
         }
         
         # 添加回归系数
         stats_results['coefficients'] = {
-            'intercept': model.intercept_,
-            'slope': model.coef_[0]
+            'intercept': diagnostics['intercept'],
+            'slope': diagnostics['slope']
         }
         
-        plt.tight_layout()
+        fig.tight_layout()
         return fig, stats_results
     
     def validate_inputs(self, inputs: Dict[str, Any]) -> bool:
         """验证输入"""
         data = inputs.get("data")
-        if data is None:
-            return False
-        
         if not isinstance(data, pd.DataFrame):
             return False
         
-        return not data.empty
\ No newline at end of file
+        # len(index)为O(1)，避免DataFrame.empty的额外开销
+        return len(data.index) > 0
\ No newline at end of file
@@ -4,12 +4,51 @@
 用于在画布上显示节点之间的连接
 """
 
-from typing import Optional, List
+import math
+import weakref
+from typing import Optional, List, Tuple
+import numpy as np
 from PyQt5.QtWidgets import QGraphicsItem, QGraphicsPathItem, QStyleOptionGraphicsItem, QWidget
 from PyQt5.QtCore import Qt, QRectF, QPointF
-from PyQt5.QtGui import QPen, QBrush, QColor, QPainterPath, QPainter, QPolygonF
+from PyQt5.QtGui import QBrush, QPainterPath, QPainter, QPolygonF
 
 from ...core.connection import Connection
+from .styles import get_pen
+
+
+# 缩放后的细节级别低于该值时不绘制箭头
+ARROW_MIN_LOD = 0.3
+
+# 箭头边长；连接两端点的直线距离短于 ARROW_MIN_DISTANCE 时不绘制箭头
+ARROW_LENGTH = 10
+ARROW_MIN_DISTANCE = 2 * ARROW_LENGTH
+
+# 指向+x方向、尖端在原点的标准箭头两翼顶点 [[lx, ly], [rx, ry]]（两翼展开30°）。
+# 曲线总是水平进入目标点，向左的连接只需整体取反（旋转180°）
+_ARROW_WINGS = np.array([
+    (-ARROW_LENGTH * 0.866, -ARROW_LENGTH * 0.5),
+    (-ARROW_LENGTH * 0.866, ARROW_LENGTH * 0.5)
+])
+
+
+def _bezier_offsets(dx: float) -> Tuple[float, Optional[Tuple[float, float, float, float]]]:
+    """
+    按横向距离计算曲线与箭头的相对几何
+
+    控制点只沿水平方向偏移，箭头方向为 (dx/2, 0)，因此形状只取决于dx，
+    与纵向距离无关。
+
+    Returns:
+        (控制点横向偏移, 箭头两翼相对目标点的偏移 (lx, ly, rx, ry))；
+        两端横向重合（箭头方向无定义）时箭头为None
+    """
+    offset = dx * 0.5
+    if offset == 0:
+        return offset, None
+    
+    # 标准箭头按连接方向（向右或向左）取向
+    (lx, ly), (rx, ry) = _ARROW_WINGS if offset > 0 else -_ARROW_WINGS
+    return offset, (float(lx), float(ly), float(rx), float(ry))
 
 
 class ConnectionGraphicsItem(QGraphicsPathItem):
@@ -20,6 +59,14 @@ class ConnectionGraphicsItem(QGraphicsPathItem):
         self.connection = connection
         self.source_pos = QPointF()
         self.target_pos = QPointF()
+        # 不含箭头的曲线路径，低细节级别时绘制
+        self._curve_path = QPainterPath()
+        
+        # 端点节点图形项的弱引用（避免与节点图形项互相持有）；
+        # _dirty 表示端点已移动、路径尚未重建
+        self._source_graphics_ref = None
+        self._target_graphics_ref = None
+        self._dirty = False
         
         self.setup_graphics()
         self.update_path()
@@ -27,15 +74,16 @@ class ConnectionGraphicsItem(QGraphicsPathItem):
     def setup_graphics(self):
         """设置图形属性"""
         # 设置画笔
-        pen = QPen(QColor(100, 100, 100), 2)
-        pen.setCapStyle(Qt.RoundCap)
-        pen.setJoinStyle(Qt.RoundJoin)
-        self.setPen(pen)
+        self.setPen(get_pen((100, 100, 100), 2, cap=Qt.RoundCap, join=Qt.RoundJoin))
         
         # 设置选中时的样式
         self.setFlag(QGraphicsItem.ItemIsSelectable, True)
         self.setFlag(QGraphicsItem.ItemIsFocusable, True)
         
+        # 不启用项缓存：拖动节点时路径每帧都变，缓存会被反复重建，
+        # 且长连接的外接矩形很大，缓存位图占用内存多
+        self.setCacheMode(QGraphicsItem.NoCache)
+        
         # 设置Z值（在节点下方）
         self.setZValue(-1)
     
@@ -49,63 +97,117 @@ class ConnectionGraphicsItem(QGraphicsPathItem):
         self.target_pos = pos
         self.update_path()
     
+    def set_endpoint_graphics(self, source_graphics, target_graphics):
+        """记录两端节点图形项（弱引用），供延迟重建路径时读取端口位置"""
+        self._source_graphics_ref = weakref.ref(source_graphics) if source_graphics else None
+        self._target_graphics_ref = weakref.ref(target_graphics) if target_graphics else None
+    
+    def mark_dirty(self) -> bool:
+        """
+        标记端点已移动，路径待重建
+
+        Returns:
+            此前是否为干净状态（调用方据此决定是否加入待刷新队列）
+        """
+        was_clean = not self._dirty
+        self._dirty = True
+        return was_clean
+    
+    def _refresh_endpoints(self):
+        """从两端节点图形项读取当前端口位置"""
+        source_graphics = self._source_graphics_ref() if self._source_graphics_ref else None
+        target_graphics = self._target_graphics_ref() if self._target_graphics_ref else None
+        if source_graphics is None or target_graphics is None:
+            return
+        
+        source_pos = source_graphics.get_output_port_position(self.connection.source_port)
+        if source_pos:
+            self.source_pos = source_pos
+        
+        target_pos = target_graphics.get_input_port_position(self.connection.target_port)
+        if target_pos:
+            self.target_pos = target_pos
+    
+    @classmethod
+    def flush_dirty(cls, items):
+        """
+        为标记为脏的连接读取最新端点并批量重建路径
+
+        同一事件循环内多次标记只在这里计算一次，已是干净状态的连接直接跳过。
+        """
+        dirty_items = [item for item in items if item._dirty]
+        for item in dirty_items:
+            item._refresh_endpoints()
+            item._dirty = False
+        cls.update_many(dirty_items)
+    
     def update_path(self):
         """更新连接路径"""
+        self._dirty = False
         path = QPainterPath()
+        source, target = self.source_pos, self.target_pos
         
-        # 计算控制点
-        dx = self.target_pos.x() - self.source_pos.x()
-        dy = self.target_pos.y() - self.source_pos.y()
+        # 控制点与箭头相对端点的偏移（规则与 update_many 相同）
+        offset, arrow = _bezier_offsets(target.x() - source.x())
         
         # 贝塞尔曲线控制点
-        ctrl1 = QPointF(
-            self.source_pos.x() + dx * 0.5,
-            self.source_pos.y()
-        )
-        ctrl2 = QPointF(
-            self.target_pos.x() - dx * 0.5,
-            self.target_pos.y()
-        )
+        ctrl1 = QPointF(source.x() + offset, source.y())
+        ctrl2 = QPointF(target.x() - offset, target.y())
         
         # 创建贝塞尔曲线
-        path.moveTo(self.source_pos)
-        path.cubicTo(ctrl1, ctrl2, self.target_pos)
+        path.moveTo(source)
+        path.cubicTo(ctrl1, ctrl2, target)
+        self._curve_path = QPainterPath(path)
         
-        # 添加箭头
-        self.add_arrow(path, self.target_pos, ctrl2)
+        # 添加箭头；连接过短（如拖动时光标靠近源端口）时箭头无法分辨，直接跳过
+        if arrow is not None and math.hypot(target.x() - source.x(),
+                                            target.y() - source.y()) >= ARROW_MIN_DISTANCE:
+            lx, ly, rx, ry = arrow
+            path.addPolygon(QPolygonF([
+                target,
+                QPointF(target.x() + lx, target.y() + ly),
+                QPointF(target.x() + rx, target.y() + ry)
+            ]))
         
+        # setPath内部已调用prepareGeometryChange并安排重绘
         self.setPath(path)
     
-    def add_arrow(self, path: QPainterPath, target: QPointF, ctrl: QPointF):
-        """添加箭头"""
-        # 计算箭头方向
-        direction = target - ctrl
-        length = (direction.x() ** 2 + direction.y() ** 2) ** 0.5
-        
-        if length == 0:
+    @classmethod
+    def update_many(cls, items: List['ConnectionGraphicsItem']):
+        """
+        批量更新多条连接的路径（拖动多个节点时使用）
+
+        控制点与箭头顶点一次性用NumPy向量化计算，再逐条写回路径，
+        结果与逐条调用 update_path 相同。
+        """
+        if not items:
             return
         
-        # 标准化方向向量
-        direction = QPointF(direction.x() / length, direction.y() / length)
-        
-        # 箭头参数
-        arrow_length = 10
-        arrow_angle = 0.4  # 约23度
+        src = np.array([(c.source_pos.x(), c.source_pos.y()) for c in items], dtype=np.float64)
+        tgt = np.array([(c.target_pos.x(), c.target_pos.y()) for c in items], dtype=np.float64)
         
-        # 计算箭头两个端点
-        left_point = QPointF(
-            target.x() - arrow_length * (direction.x() * 0.866 - direction.y() * 0.5),
-            target.y() - arrow_length * (direction.y() * 0.866 + direction.x() * 0.5)
-        )
+        # 贝塞尔曲线控制点：沿水平方向偏移一半的横向距离
+        half_dx = 0.5 * (tgt[:, 0] - src[:, 0])
+        ctrl1 = src.copy()
+        ctrl1[:, 0] += half_dx
+        ctrl2 = tgt.copy()
+        ctrl2[:, 0] -= half_dx
         
-        right_point = QPointF(
-            target.x() - arrow_length * (direction.x() * 0.866 + direction.y() * 0.5),
-            target.y() - arrow_length * (direction.y() * 0.866 - direction.x() * 0.5)
-        )
+        # 箭头规则与 _bezier_offsets 相同：按横向距离的符号取标准箭头或其镜像
+        span = tgt - src
+        has_arrow = (half_dx != 0) & (np.hypot(span[:, 0], span[:, 1]) >= ARROW_MIN_DISTANCE)
+        wings = np.sign(half_dx)[:, None, None] * _ARROW_WINGS
+        left = tgt + wings[:, 0]
+        right = tgt + wings[:, 1]
         
-        # 绘制箭头
-        arrow = QPolygonF([target, left_point, right_point])
-        path.addPolygon(arrow)
+        for i, item in enumerate(items):
+            path = QPainterPath()
+            path.moveTo(item.source_pos)
+            path.cubicTo(QPointF(*ctrl1[i]), QPointF(*ctrl2[i]), item.target_pos)
+            item._curve_path = QPainterPath(path)
+            if has_arrow[i]:
+                path.addPolygon(QPolygonF([item.target_pos, QPointF(*left[i]), QPointF(*right[i])]))
+            item.setPath(path)
     
     def paint(self, painter: QPainter, option: QStyleOptionGraphicsItem, widget: QWidget = None):
         """自定义绘制"""
@@ -114,22 +216,23 @@ class ConnectionGraphicsItem(QGraphicsPathItem):
         
         # 根据选中状态设置颜色
         if self.isSelected():
-            pen = QPen(QColor(255, 165, 0), 3)  # 橙色
+            pen = get_pen((255, 165, 0), 3, cap=Qt.RoundCap, join=Qt.RoundJoin)  # 橙色
         elif self.connection.is_valid():
-            pen = QPen(QColor(100, 200, 100), 2)  # 绿色
+            pen = get_pen((100, 200, 100), 2, cap=Qt.RoundCap, join=Qt.RoundJoin)  # 绿色
         else:
-            pen = QPen(QColor(200, 100, 100), 2)  # 红色
+            pen = get_pen((200, 100, 100), 2, cap=Qt.RoundCap, join=Qt.RoundJoin)  # 红色
         
-        pen.setCapStyle(Qt.RoundCap)
-        pen.setJoinStyle(Qt.RoundJoin)
         painter.setPen(pen)
+        # 视图不保存画家状态，显式清除上一个图形项留下的画刷
+        painter.setBrush(Qt.NoBrush)
         
-        # 绘制路径
-        painter.drawPath(self.path())
+        # 绘制路径；缩小到箭头难以分辨时只画曲线
+        lod = option.levelOfDetailFromTransform(painter.worldTransform())
+        painter.drawPath(self.path() if lod >= ARROW_MIN_LOD else self._curve_path)
         
         # 如果选中，绘制选择框
         if self.isSelected():
-            painter.setPen(QPen(QColor(255, 165, 0), 1, Qt.DashLine))
+            painter.setPen(get_pen((255, 165, 0), 1, Qt.DashLine))
             painter.setBrush(Qt.NoBrush)
             painter.drawRect(self.boundingRect())
     
@@ -192,12 +295,10 @@ class ConnectionGraphicsItem(QGraphicsPathItem):
     def set_highlight(self, highlight: bool):
         """设置高亮状态"""
         if highlight:
-            pen = QPen(QColor(255, 255, 0), 3)  # 黄色高亮
+            pen = get_pen((255, 255, 0), 3, cap=Qt.RoundCap, join=Qt.RoundJoin)  # 黄色高亮
         else:
-            pen = QPen(QColor(100, 100, 100), 2)  # 默认颜色
+            pen = get_pen((100, 100, 100), 2, cap=Qt.RoundCap, join=Qt.RoundJoin)  # 默认颜色
         
-        pen.setCapStyle(Qt.RoundCap)
-        pen.setJoinStyle(Qt.RoundJoin)
         self.setPen(pen)
         
         self.update()
@@ -236,7 +337,7 @@ class ConnectionGraphicsItem(QGraphicsPathItem):
     def itemChange(self, change, value):
         """项目变化事件"""
         if change == QGraphicsItem.ItemSelectedChange:
-            # 选中状态变化时更新显示
-            self.update()
+            # 选中状态变化时只重绘本项的边界矩形
+            self.update(self.boundingRect())
         
         return super().itemChange(change, value)
\ No newline at end of file
@@ -6,18 +6,41 @@
 
 from typing import Optional, Dict, Any, List
 from PyQt5.QtWidgets import (
-    QGraphicsItem, QGraphicsRectItem, QGraphicsTextItem, QGraphicsEllipseItem,
+    QGraphicsItem, QGraphicsRectItem, QGraphicsEllipseItem,
     QStyleOptionGraphicsItem, QWidget, QMenu, QAction, QGraphicsProxyWidget,
     QLabel, QVBoxLayout, QHBoxLayout, QFrame
 )
-from PyQt5.QtCore import Qt, QRectF, QPointF, pyqtSignal, QObject
+from PyQt5.QtCore import Qt, QRectF, QPointF, pyqtSignal, QObject, QTimer
 from PyQt5.QtGui import (
-    QPen, QBrush, QColor, QPainter, QFont, QFontMetrics, QPainterPath,
-    QLinearGradient, QRadialGradient
+    QBrush, QColor, QPainter, QFont, QFontMetrics, QPainterPath,
+    QLinearGradient, QRadialGradient, QStaticText, QTransform
 )
 
 from ...nodes.base import BaseNode
 from ...core.port import Port, PortType
+from .styles import get_brush, get_pen
+
+
+# 拖动节点时连接更新的合并间隔（约一帧）
+DRAG_UPDATE_INTERVAL_MS = 16
+
+# 缩放后的细节级别低于该值时隐藏标题 / 用纯色代替渐变
+TITLE_MIN_LOD = 0.4
+GRADIENT_MIN_LOD = 0.25
+
+# 细节级别低于该值时圆角已不足几个像素，节点主体关闭抗锯齿以减少填充开销
+BODY_ANTIALIAS_MIN_LOD = 0.5
+
+# 所有节点标题共用的字体，首次使用时创建（QFont需在QApplication之后构造）
+_TITLE_FONT: Optional[QFont] = None
+
+
+def _title_font() -> QFont:
+    """返回共享的节点标题字体"""
+    global _TITLE_FONT
+    if _TITLE_FONT is None:
+        _TITLE_FONT = QFont("Arial", 10, QFont.Bold)
+    return _TITLE_FONT
 
 
 class PortGraphicsItem(QGraphicsEllipseItem):
@@ -41,8 +64,12 @@ class PortGraphicsItem(QGraphicsEllipseItem):
         else:
             color = QColor(200, 150, 100)  # 橙色
         
-        self.setBrush(QBrush(color))
-        self.setPen(QPen(QColor(50, 50, 50), 2))
+        # 常态与悬停画刷只创建一次，悬停切换时直接复用
+        self._base_brush = QBrush(color)
+        self._hover_brush = QBrush(color.lighter(150))
+        
+        self.setBrush(self._base_brush)
+        self.setPen(get_pen((50, 50, 50), 2))
         
         # 设置工具提示
         tooltip = f"{self.port.name}\n类型: {self.port.data_type}\n描述: {self.port.description}"
@@ -55,17 +82,13 @@ class PortGraphicsItem(QGraphicsEllipseItem):
     def hoverEnterEvent(self, event):
         """鼠标悬停进入"""
         # 高亮显示
-        self.setBrush(QBrush(self.brush().color().lighter(150)))
+        self.setBrush(self._hover_brush)
         super().hoverEnterEvent(event)
     
     def hoverLeaveEvent(self, event):
         """鼠标悬停离开"""
         # 恢复原色
-        if self.port.port_type == PortType.INPUT:
-            color = QColor(100, 150, 200)
-        else:
-            color = QColor(200, 150, 100)
-        self.setBrush(QBrush(color))
+        self.setBrush(self._base_brush)
         super().hoverLeaveEvent(event)
     
     def get_port(self) -> Port:
@@ -87,6 +110,9 @@ class NodeSignals(QObject):
 class NodeGraphicsItem(QGraphicsRectItem):
     """节点图形项"""
     
+    # 按 (节点类型, 高度) 共享的 (渐变画刷, 纯色画刷)，首次使用时创建
+    _BRUSH_CACHE: Dict[tuple, tuple] = {}
+    
     def __init__(self, node: BaseNode):
         super().__init__()
         self.node = node
@@ -97,11 +123,20 @@ class NodeGraphicsItem(QGraphicsRectItem):
         self.height = 100
         self.corner_radius = 8
         
+        # 标题（缓存字形布局的QStaticText，在paint中直接绘制）
+        self._static_text = QStaticText(self.node.name)
+        self._title_pos = QPointF()
+        
         # 子项
-        self.title_item = None
         self.input_ports: List[PortGraphicsItem] = []
         self.output_ports: List[PortGraphicsItem] = []
         
+        # 拖动时是否已安排一次连接更新
+        self._update_pending = False
+        
+        # 圆角矩形轮廓，只在尺寸变化时重建
+        self._shape_path = QPainterPath()
+        
         self.setup_graphics()
         self.create_ports()
         self.update_layout()
@@ -111,28 +146,40 @@ class NodeGraphicsItem(QGraphicsRectItem):
         # 设置基本属性
         self.setRect(0, 0, self.width, self.height)
         
-        # 设置颜色（根据节点类型）
-        node_colors = {
-            'INPUT': QColor(150, 200, 150),      # 绿色
-            'OUTPUT': QColor(200, 150, 150),     # 红色
-            'PROCESSING': QColor(150, 150, 200), # 蓝色
-            'ANALYSIS': QColor(200, 200, 150),   # 黄色
-            'VISUALIZATION': QColor(200, 150, 200), # 紫色
-        }
-        
         node_type = getattr(self.node, 'node_type', 'PROCESSING')
         if hasattr(node_type, 'value'):
             node_type = node_type.value
         
-        base_color = node_colors.get(str(node_type).upper(), QColor(150, 150, 150))
-        
-        # 创建渐变
-        gradient = QLinearGradient(0, 0, 0, self.height)
-        gradient.setColorAt(0, base_color.lighter(120))
-        gradient.setColorAt(1, base_color.darker(120))
-        
-        self.setBrush(QBrush(gradient))
-        self.setPen(QPen(QColor(100, 100, 100), 2))
+        key = (str(node_type).upper(), self.height)
+        brushes = NodeGraphicsItem._BRUSH_CACHE.get(key)
+        if brushes is None:
+            # 设置颜色（根据节点类型）
+            node_colors = {
+                'INPUT': QColor(150, 200, 150),      # 绿色
+                'OUTPUT': QColor(200, 150, 150),     # 红色
+                'PROCESSING': QColor(150, 150, 200), # 蓝色
+                'ANALYSIS': QColor(200, 200, 150),   # 黄色
+                'VISUALIZATION': QColor(200, 150, 200), # 紫色
+            }
+            base_color = node_colors.get(key[0], QColor(150, 150, 150))
+            
+            # 创建渐变
+            gradient = QLinearGradient(0, 0, 0, self.height)
+            gradient.setColorAt(0, base_color.lighter(120))
+            gradient.setColorAt(1, base_color.darker(120))
+            brushes = (QBrush(gradient), QBrush(base_color))
+            NodeGraphicsItem._BRUSH_CACHE[key] = brushes
+        
+        brush, self._flat_brush = brushes
+        self.setBrush(brush)
+        self.setPen(get_pen((100, 100, 100), 2))
+        
+        # paint中使用的状态画刷/画笔，取自共享样式缓存，绘制时不再分配
+        self._sel_pen = get_pen((255, 165, 0), 3)  # 橙色边框
+        self._exec_brush = get_brush((0, 255, 0))
+        self._exec_pen = get_pen((0, 200, 0), 1)
+        self._err_brush = get_brush((255, 0, 0))
+        self._err_pen = get_pen((200, 0, 0), 1)
         
         # 设置交互属性
         self.setFlag(QGraphicsItem.ItemIsMovable, True)
@@ -140,14 +187,19 @@ class NodeGraphicsItem(QGraphicsRectItem):
         self.setFlag(QGraphicsItem.ItemSendsGeometryChanges, True)
         self.setFlag(QGraphicsItem.ItemIsFocusable, True)
         
+        # 按设备坐标缓存绘制结果，平移/拖动其他节点时不重新光栅化；
+        # setRect/setPen/update() 会使缓存失效。
+        # 画布默认使用光栅视口，Qt5的QPixmap由QImage实现（QRasterPlatformPixmap），
+        # 缓存本身就位于内存中，无需另建QImage后备缓存；显式启用OpenGL视口时缓存位图
+        # 作为纹理上传，仍可避免逐帧重绘节点
+        self.setCacheMode(QGraphicsItem.DeviceCoordinateCache)
+        
         # 设置Z值
         self.setZValue(1)
         
-        # 创建标题
-        self.title_item = QGraphicsTextItem(self.node.name, self)
-        font = QFont("Arial", 10, QFont.Bold)
-        self.title_item.setFont(font)
-        self.title_item.setDefaultTextColor(QColor(50, 50, 50))
+        # 标题文字画笔，并按标题字体预先排版
+        self._title_pen = get_pen((50, 50, 50))
+        self._static_text.prepare(QTransform(), _title_font())
     
     def create_ports(self):
         """创建端口"""
@@ -166,63 +218,81 @@ class NodeGraphicsItem(QGraphicsRectItem):
         # 调整节点大小
         port_count = max(len(self.input_ports), len(self.output_ports))
         self.height = max(100, 40 + port_count * 20)
-        self.setRect(0, 0, self.width, self.height)
+        if self.rect() != QRectF(0, 0, self.width, self.height) or self._shape_path.isEmpty():
+            self.setRect(0, 0, self.width, self.height)
+            self._shape_path = QPainterPath()
+            self._shape_path.addRoundedRect(self.rect(), self.corner_radius, self.corner_radius)
         
         # 更新标题位置
-        if self.title_item:
-            title_rect = self.title_item.boundingRect()
-            title_x = (self.width - title_rect.width()) / 2
-            self.title_item.setPos(title_x, 10)
+        title_x = (self.width - self._static_text.size().width()) / 2
+        self._title_pos = QPointF(title_x, 10)
         
-        # 更新输入端口位置
+        # 更新端口位置：位置未变的端口跳过setPos，避免无谓的几何变化与重绘
         port_spacing = 20
         start_y = 40
-        for i, port_item in enumerate(self.input_ports):
-            port_item.setPos(-port_item.radius, start_y + i * port_spacing)
-        
-        # 更新输出端口位置
-        for i, port_item in enumerate(self.output_ports):
-            port_item.setPos(self.width + port_item.radius, start_y + i * port_spacing)
+        targets = [
+            (port_item, QPointF(-port_item.radius, start_y + i * port_spacing))
+            for i, port_item in enumerate(self.input_ports)
+        ] + [
+            (port_item, QPointF(self.width + port_item.radius, start_y + i * port_spacing))
+            for i, port_item in enumerate(self.output_ports)
+        ]
+        for port_item, pos in targets:
+            if port_item.pos() != pos:
+                port_item.setPos(pos)
+        
+        # 使设备坐标缓存失效
+        self.update()
     
     def paint(self, painter: QPainter, option: QStyleOptionGraphicsItem, widget: QWidget = None):
         """自定义绘制"""
-        # 设置抗锯齿
-        painter.setRenderHint(QPainter.Antialiasing, True)
-        
-        # 绘制圆角矩形
+        # 绘制圆角矩形（轮廓在 update_layout 中缓存）
         rect = self.rect()
-        path = QPainterPath()
-        path.addRoundedRect(rect, self.corner_radius, self.corner_radius)
+        
+        # 细节级别：缩小到一定程度后不绘制标题文字，再小则不绘制渐变
+        lod = option.levelOfDetailFromTransform(painter.worldTransform())
+        
+        # 圆角需要抗锯齿，只在缩小到圆角难以分辨时关闭
+        painter.setRenderHint(QPainter.Antialiasing, lod >= BODY_ANTIALIAS_MIN_LOD)
         
         # 设置画刷和画笔
         if self.isSelected():
             # 选中状态
-            pen = QPen(QColor(255, 165, 0), 3)  # 橙色边框
-            painter.setPen(pen)
+            painter.setPen(self._sel_pen)
         else:
             painter.setPen(self.pen())
         
-        painter.setBrush(self.brush())
-        painter.drawPath(path)
+        painter.setBrush(self.brush() if lod >= GRADIENT_MIN_LOD else self._flat_brush)
+        painter.drawPath(self._shape_path)
+        
+        # 文字与状态圆点需要抗锯齿
+        painter.setRenderHint(QPainter.Antialiasing, True)
+        
+        # 绘制标题
+        if lod > TITLE_MIN_LOD:
+            painter.setFont(_title_font())
+            painter.setPen(self._title_pen)
+            painter.drawStaticText(self._title_pos, self._static_text)
         
         # 绘制状态指示器
         if hasattr(self.node, 'is_executing') and self.node.is_executing:
             # 执行中状态
-            painter.setBrush(QBrush(QColor(0, 255, 0)))
-            painter.setPen(QPen(QColor(0, 200, 0), 1))
+            painter.setBrush(self._exec_brush)
+            painter.setPen(self._exec_pen)
             painter.drawEllipse(rect.width() - 15, 5, 10, 10)
         elif hasattr(self.node, 'has_error') and self.node.has_error:
             # 错误状态
-            painter.setBrush(QBrush(QColor(255, 0, 0)))
-            painter.setPen(QPen(QColor(200, 0, 0), 1))
+            painter.setBrush(self._err_brush)
+            painter.setPen(self._err_pen)
             painter.drawEllipse(rect.width() - 15, 5, 10, 10)
     
     def boundingRect(self) -> QRectF:
         """返回边界矩形"""
         rect = self.rect()
-        # 扩展边界以包含端口
+        # 扩展边界以包含端口，上下留出选中/高亮描边的宽度
         port_radius = 6
-        return rect.adjusted(-port_radius, 0, port_radius, 0)
+        stroke_margin = 3
+        return rect.adjusted(-port_radius, -stroke_margin, port_radius, stroke_margin)
     
     def mousePressEvent(self, event):
         """鼠标按下事件"""
@@ -290,18 +360,26 @@ class NodeGraphicsItem(QGraphicsRectItem):
     
     def itemChange(self, change, value):
         """项目变化事件"""
-        if change == QGraphicsItem.ItemPositionChange:
-            # 位置变化时更新连接
-            if hasattr(self.scene(), 'update_connections'):
-                self.scene().update_connections(self.node)
-            
-            self.signals.position_changed.emit(self.node)
+        if change == QGraphicsItem.ItemPositionHasChanged:
+            # 位置确定后更新连接（ItemPositionChange在提交前触发，可能被修正）：
+            # 每帧最多一次，合并拖动中的大量位置事件
+            if not self._update_pending:
+                self._update_pending = True
+                QTimer.singleShot(DRAG_UPDATE_INTERVAL_MS, self._flush_updates)
         
         elif change == QGraphicsItem.ItemSelectedChange:
             self.signals.selection_changed.emit(self.node, value)
         
         return super().itemChange(change, value)
     
+    def _flush_updates(self):
+        """执行合并后的连接更新并发出位置变化信号"""
+        self._update_pending = False
+        if hasattr(self.scene(), 'update_connections'):
+            self.scene().update_connections(self.node)
+        
+        self.signals.position_changed.emit(self.node)
+    
     def get_node(self) -> BaseNode:
         """获取节点对象"""
         return self.node
@@ -335,19 +413,25 @@ class NodeGraphicsItem(QGraphicsRectItem):
         """设置执行状态"""
         if hasattr(self.node, 'is_executing'):
             self.node.is_executing = executing
-        self.update()
+        # 只重绘状态指示器所在区域
+        self.update(self._status_rect())
     
     def set_error(self, has_error: bool):
         """设置错误状态"""
         if hasattr(self.node, 'has_error'):
             self.node.has_error = has_error
-        self.update()
+        # 只重绘状态指示器所在区域
+        self.update(self._status_rect())
+    
+    def _status_rect(self) -> QRectF:
+        """状态指示器（含描边）的局部矩形"""
+        return QRectF(self.rect().width() - 16, 4, 12, 12)
     
     def update_node_data(self):
         """更新节点数据显示"""
         # 更新标题
-        if self.title_item:
-            self.title_item.setPlainText(self.node.name)
+        self._static_text.setText(self.node.name)
+        self._static_text.prepare(QTransform(), _title_font())
         
         # 更新工具提示
         tooltip = f"节点: {self.node.name}\n类型: {self.node.node_type}\n描述: {self.node.description}"
@@ -358,12 +442,10 @@ class NodeGraphicsItem(QGraphicsRectItem):
     
     def highlight(self, highlight: bool):
         """设置高亮状态"""
+        # setPen 本身会重绘该项，无需再调用update
         if highlight:
             # 高亮显示
-            pen = QPen(QColor(255, 255, 0), 4)  # 黄色边框
-            self.setPen(pen)
+            self.setPen(get_pen((255, 255, 0), 4))  # 黄色边框
         else:
             # 恢复默认
-            self.setPen(QPen(QColor(100, 100, 100), 2))
-        
-        self.update()
\ No newline at end of file
+            self.setPen(get_pen((100, 100, 100), 2))
\ No newline at end of file
@@ -0,0 +1,54 @@
+"""
+画布样式缓存
+
+按样式参数共享QPen/QBrush对象，避免在绘制路径中重复构造
+"""
+
+from typing import Dict, Tuple
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QPen, QBrush, QColor
+
+
+# (类型, 样式参数...) -> 已构造的QPen/QBrush
+_STYLE_CACHE: Dict[tuple, object] = {}
+
+
+def get_pen(rgb: Tuple[int, int, int], width: float = 1, style=Qt.SolidLine,
+            cap=Qt.SquareCap, join=Qt.BevelJoin) -> QPen:
+    """
+    获取共享的画笔
+
+    返回的对象被所有调用方共享，不要原地修改（setPen会复制画笔）。
+
+    Args:
+        rgb: 颜色 (r, g, b)
+        width: 线宽
+        style: 线型
+        cap: 端点样式
+        join: 连接样式
+
+    Returns:
+        缓存的QPen
+    """
+    key = ('pen', rgb, width, style, cap, join)
+    pen = _STYLE_CACHE.get(key)
+    if pen is None:
+        pen = _STYLE_CACHE[key] = QPen(QColor(*rgb), width, style, cap, join)
+    return pen
+
+
+def get_brush(rgb: Tuple[int, int, int]) -> QBrush:
+    """
+    获取共享的纯色画刷
+
+    Args:
+        rgb: 颜色 (r, g, b)
+
+    Returns:
+        缓存的QBrush
+    """
+    key = ('brush', rgb)
+    brush = _STYLE_CACHE.get(key)
+    if brush is None:
+        brush = _STYLE_CACHE[key] = QBrush(QColor(*rgb))
+    return brush
@@ -4,22 +4,48 @@
 用于编辑和显示工作流图
 """
 
+import math
+import os
+from collections import defaultdict
 from typing import Dict, List, Optional, Tuple, Any
 from PyQt5.QtWidgets import (
-    QGraphicsView, QGraphicsScene, QGraphicsItem, QMenu, QAction,
+    QGraphicsView, QGraphicsScene, QGraphicsItem, QMenu,
     QApplication, QRubberBand, QMessageBox
 )
-from PyQt5.QtCore import Qt, QPointF, QRectF, pyqtSignal, QPoint, QRect
+from PyQt5.QtCore import Qt, QPointF, QRectF, pyqtSignal, QPoint, QRect, QTimer
 from PyQt5.QtGui import (
     QPainter, QWheelEvent, QMouseEvent, QKeyEvent, QDragEnterEvent,
-    QDropEvent, QPen, QBrush, QColor
+    QDropEvent, QPen
 )
 
 from ...core.workflow import Workflow
 from ...nodes.base import BaseNode
 from ...core.connection import Connection
+from ...core.port import Port
 from .node_graphics import NodeGraphicsItem
 from .connection_graphics import ConnectionGraphicsItem
+from .styles import get_brush
+
+try:
+    from PyQt5.QtWidgets import QOpenGLWidget
+    from PyQt5.QtGui import QSurfaceFormat, QOpenGLContext
+    OPENGL_AVAILABLE = True
+except ImportError:
+    OPENGL_AVAILABLE = False
+
+
+# 视口裁剪时向外扩展的边距（场景坐标）
+CULL_MARGIN = 64
+
+# 创建连接时临时连线跟随鼠标的最小刷新间隔（约120Hz）
+TEMP_CONNECTION_UPDATE_MS = 8
+
+# 节点数超过该值时改用整视口刷新，省去逐项计算暴露区域的开销
+FULL_VIEWPORT_UPDATE_THRESHOLD = 200
+
+# OpenGL视口的多重采样数。OpenGL视口需设置环境变量 DWA_CANVAS_OPENGL=1 显式启用：
+# 远程桌面、虚拟机与软件GL环境下可能无法得到可用的上下文，默认使用光栅视口
+OPENGL_SAMPLES = 4
 
 
 class WorkflowCanvas(QGraphicsView):
@@ -41,18 +67,38 @@ class WorkflowCanvas(QGraphicsView):
         # 图形项映射
         self.node_graphics: Dict[str, NodeGraphicsItem] = {}  # node_id -> graphics
         self.connection_graphics: Dict[str, ConnectionGraphicsItem] = {}  # connection_id -> graphics
+        self._node_to_connections: Dict[str, List[Connection]] = defaultdict(list)  # node_id -> 相连的连接
+        self._port_items: Dict[QGraphicsItem, Port] = {}  # 端口图形项 -> 端口，用于命中测试
         
         # 连接创建状态
         self.creating_connection = False
         self.connection_start_port = None
         self.temp_connection = None
         
+        # 合并高频鼠标移动事件：只保留最新位置，定时器到期时再更新临时连线
+        self._pending_target_pos: Optional[QPointF] = None
+        self._temp_update_timer = QTimer(self)
+        self._temp_update_timer.setSingleShot(True)
+        self._temp_update_timer.setInterval(TEMP_CONNECTION_UPDATE_MS)
+        self._temp_update_timer.timeout.connect(self._apply_pending_target_pos)
+        
         # 选择状态
         self.selection_rect = None
         self.selection_start = None
         
+        # 因不在视口内而推迟更新的连接ID
+        self._dirty_connections: set = set()
+        
+        # 端点已移动、等待在下一轮事件循环中批量重建路径的连接图形项
+        self._pending_path_items: List[ConnectionGraphicsItem] = []
+        self._path_update_timer = QTimer(self)
+        self._path_update_timer.setSingleShot(True)
+        self._path_update_timer.setInterval(0)
+        self._path_update_timer.timeout.connect(self._flush_pending_paths)
+        
         self.setup_canvas()
         self.setup_scene()
+        self.setup_context_menus()
     
     def setup_canvas(self):
         """设置画布属性"""
@@ -61,6 +107,19 @@ class WorkflowCanvas(QGraphicsView):
         self.setRenderHint(QPainter.TextAntialiasing, True)
         self.setRenderHint(QPainter.SmoothPixmapTransform, True)
         
+        # 各图形项的paint都会重新设置画笔/画刷，无需在每个项前后保存恢复画家状态；
+        # 边界矩形已包含描边宽度，无需为抗锯齿额外扩大重绘区域
+        self.setOptimizationFlags(QGraphicsView.DontSavePainterState |
+                                  QGraphicsView.DontAdjustForAntialiasing)
+        
+        # 启用OpenGL视口时由GPU光栅化并用MSAA抗锯齿，此时每帧本就重绘整个缓冲区，固定整视口刷新；
+        # 光栅视口下小场景只重绘变化项的外接矩形，节点增多后由 _update_viewport_mode 切换
+        self._use_opengl = self._setup_opengl_viewport()
+        if self._use_opengl:
+            self.setViewportUpdateMode(QGraphicsView.FullViewportUpdate)
+        else:
+            self.setViewportUpdateMode(QGraphicsView.BoundingRectViewportUpdate)
+        
         # 设置拖拽模式
         self.setDragMode(QGraphicsView.RubberBandDrag)
         
@@ -77,14 +136,20 @@ class WorkflowCanvas(QGraphicsView):
         
         # 设置最小尺寸
         self.setMinimumSize(400, 300)
+        
+        # 滚动后补做进入视口的连接更新
+        self.horizontalScrollBar().valueChanged.connect(self._flush_dirty_connections)
+        self.verticalScrollBar().valueChanged.connect(self._flush_dirty_connections)
     
     def setup_scene(self):
         """设置场景"""
         self.scene = QGraphicsScene(self)
         self.scene.setSceneRect(-5000, -5000, 10000, 10000)
+        # 点击、右键菜单与连线时的 itemAt 命中测试依赖BSP索引，避免线性扫描全部图形项
+        self.scene.setItemIndexMethod(QGraphicsScene.BspTreeIndex)
         
         # 设置背景
-        self.scene.setBackgroundBrush(QBrush(QColor(240, 240, 240)))
+        self.scene.setBackgroundBrush(get_brush((240, 240, 240)))
         
         # 连接场景信号
         self.scene.selectionChanged.connect(self.on_selection_changed)
@@ -104,19 +169,36 @@ class WorkflowCanvas(QGraphicsView):
         if not self.workflow:
             return
         
-        # 添加节点
-        for node in self.workflow.get_nodes():
-            self.add_node_graphics(node)
-        
-        # 添加连接
-        for connection in self.workflow.get_connections():
-            self.add_connection_graphics(connection)
+        # 批量添加期间停用索引、暂停重绘并屏蔽场景信号，结束后一次性重建BSP树
+        self.setUpdatesEnabled(False)
+        self.scene.blockSignals(True)
+        self.scene.setItemIndexMethod(QGraphicsScene.NoIndex)
+        try:
+            # 添加节点
+            for node in self.workflow.get_nodes():
+                self.add_node_graphics(node)
+            
+            # 添加连接
+            for connection in self.workflow.get_connections():
+                self.add_connection_graphics(connection)
+        finally:
+            self.scene.setItemIndexMethod(QGraphicsScene.BspTreeIndex)
+            self._tune_bsp_depth()
+            self.scene.blockSignals(False)
+            self.setUpdatesEnabled(True)
     
     def clear_canvas(self):
         """清除画布"""
+        # 待重建的图形项随场景一起销毁，先丢弃队列
+        self._path_update_timer.stop()
+        self._pending_path_items.clear()
         self.scene.clear()
         self.node_graphics.clear()
         self.connection_graphics.clear()
+        self._node_to_connections.clear()
+        self._port_items.clear()
+        self._dirty_connections.clear()
+        self._update_viewport_mode()
     
     def add_node_graphics(self, node: BaseNode) -> NodeGraphicsItem:
         """添加节点图形项"""
@@ -137,6 +219,10 @@ class WorkflowCanvas(QGraphicsView):
         
         # 保存映射
         self.node_graphics[node.id] = graphics_item
+        for port_item in graphics_item.input_ports + graphics_item.output_ports:
+            self._port_items[port_item] = port_item.get_port()
+        self._update_viewport_mode()
+        self._tune_bsp_depth()
         
         return graphics_item
     
@@ -146,6 +232,49 @@ class WorkflowCanvas(QGraphicsView):
             graphics_item = self.node_graphics[node.id]
             self.scene.removeItem(graphics_item)
             del self.node_graphics[node.id]
+            for port_item in graphics_item.input_ports + graphics_item.output_ports:
+                self._port_items.pop(port_item, None)
+            self._node_to_connections.pop(node.id, None)
+            self._update_viewport_mode()
+    
+    def _tune_bsp_depth(self):
+        """按图形项数量调整BSP树深度，使每个叶子约容纳一个图形项"""
+        if self.scene.itemIndexMethod() != QGraphicsScene.BspTreeIndex:
+            return
+        item_count = len(self.node_graphics) + len(self.connection_graphics)
+        depth = int(math.log2(max(item_count, 1))) + 1
+        if self.scene.bspTreeDepth() != depth:
+            self.scene.setBspTreeDepth(depth)
+    
+    def _setup_opengl_viewport(self) -> bool:
+        """按需将视口替换为多重采样的QOpenGLWidget，返回是否启用"""
+        if not OPENGL_AVAILABLE or os.environ.get("DWA_CANVAS_OPENGL", "0") != "1":
+            return False
+        
+        fmt = QSurfaceFormat()
+        fmt.setSamples(OPENGL_SAMPLES)
+        
+        # 先试建上下文，无法创建时保留光栅视口
+        context = QOpenGLContext()
+        context.setFormat(fmt)
+        if not context.create():
+            return False
+        
+        gl_widget = QOpenGLWidget()
+        gl_widget.setFormat(fmt)
+        self.setViewport(gl_widget)
+        return True
+    
+    def _update_viewport_mode(self):
+        """按节点数量选择视口刷新模式（OpenGL视口固定整视口刷新）"""
+        if self._use_opengl:
+            return
+        if len(self.node_graphics) > FULL_VIEWPORT_UPDATE_THRESHOLD:
+            mode = QGraphicsView.FullViewportUpdate
+        else:
+            mode = QGraphicsView.BoundingRectViewportUpdate
+        if self.viewportUpdateMode() != mode:
+            self.setViewportUpdateMode(mode)
     
     def add_connection_graphics(self, connection: Connection) -> ConnectionGraphicsItem:
         """添加连接图形项"""
@@ -155,11 +284,17 @@ class WorkflowCanvas(QGraphicsView):
         # 添加到场景
         self.scene.addItem(graphics_item)
         
-        # 更新连接位置
-        self.update_connection_graphics(connection)
-        
         # 保存映射
         self.connection_graphics[connection.id] = graphics_item
+        self._node_to_connections[connection.source_node.id].append(connection)
+        self._node_to_connections[connection.target_node.id].append(connection)
+        graphics_item.set_endpoint_graphics(
+            self.node_graphics.get(connection.source_node.id),
+            self.node_graphics.get(connection.target_node.id)
+        )
+        
+        # 更新连接位置
+        self.update_connection_graphics(connection)
         
         return graphics_item
     
@@ -169,37 +304,107 @@ class WorkflowCanvas(QGraphicsView):
             graphics_item = self.connection_graphics[connection.id]
             self.scene.removeItem(graphics_item)
             del self.connection_graphics[connection.id]
+            if graphics_item in self._pending_path_items:
+                self._pending_path_items.remove(graphics_item)
+            self._dirty_connections.discard(connection.id)
+            for node in (connection.source_node, connection.target_node):
+                connections = self._node_to_connections.get(node.id)
+                if connections and connection in connections:
+                    connections.remove(connection)
+                    if not connections:
+                        del self._node_to_connections[node.id]
     
     def update_connection_graphics(self, connection: Connection):
-        """更新连接图形项位置"""
-        if connection.id not in self.connection_graphics:
+        """
+        标记连接图形项待更新
+
+        只记录脏标记并安排一次零延迟刷新，同一轮事件循环中的多次标记
+        （如同时拖动连接两端的节点）合并为一次路径重建。
+        """
+        graphics_item = self.connection_graphics.get(connection.id)
+        if graphics_item is None:
             return
         
-        graphics_item = self.connection_graphics[connection.id]
-        
-        # 获取源节点和目标节点的图形项
-        source_graphics = self.node_graphics.get(connection.source_node.id)
-        target_graphics = self.node_graphics.get(connection.target_node.id)
-        
-        if source_graphics and target_graphics:
-            # 源端口位置
-            source_pos = source_graphics.get_output_port_position(connection.source_port)
-            if source_pos:
-                graphics_item.set_source_pos(source_pos)
-            
-            # 目标端口位置
-            target_pos = target_graphics.get_input_port_position(connection.target_port)
-            if target_pos:
-                graphics_item.set_target_pos(target_pos)
+        # 曾因不在视口内被推迟的连接仍是脏的，需重新加入队列以便按新位置判断可见性
+        if graphics_item.mark_dirty() or connection.id in self._dirty_connections:
+            self._dirty_connections.discard(connection.id)
+            self._pending_path_items.append(graphics_item)
+        if not self._path_update_timer.isActive():
+            self._path_update_timer.start()
+    
+    def _flush_pending_paths(self):
+        """批量重建视口内待更新连接的路径，视口外的连接推迟到进入视口时再计算"""
+        items, self._pending_path_items = self._pending_path_items, []
+        visible_rect = self._visible_scene_rect()
+        visible_items = []
+        for graphics_item in items:
+            connection = graphics_item.get_connection()
+            if self._connection_visible(connection, visible_rect):
+                visible_items.append(graphics_item)
+            else:
+                self._dirty_connections.add(connection.id)
+        ConnectionGraphicsItem.flush_dirty(visible_items)
     
     def update_all_connections(self):
-        """更新所有连接"""
+        """更新所有连接（视口外的连接推迟到进入视口时再计算）"""
         if not self.workflow:
             return
         
         for connection in self.workflow.get_connections():
             self.update_connection_graphics(connection)
     
+    def _visible_scene_rect(self) -> QRectF:
+        """当前视口在场景坐标中的范围（向外扩展 CULL_MARGIN）"""
+        rect = self.mapToScene(self.viewport().rect()).boundingRect()
+        return rect.adjusted(-CULL_MARGIN, -CULL_MARGIN, CULL_MARGIN, CULL_MARGIN)
+    
+    def _connection_visible(self, connection: Connection, visible_rect: QRectF) -> bool:
+        """
+        连接是否可能出现在视口中
+
+        曲线控制点都落在两端点的外接矩形内，因此用两端节点外接矩形的并集判断；
+        再并上当前（可能已过期的）路径范围，保证视口内的旧曲线也会被重建。
+        """
+        source_graphics = self.node_graphics.get(connection.source_node.id)
+        target_graphics = self.node_graphics.get(connection.target_node.id)
+        if not source_graphics or not target_graphics:
+            return True
+        
+        bounds = source_graphics.sceneBoundingRect().united(target_graphics.sceneBoundingRect())
+        graphics_item = self.connection_graphics.get(connection.id)
+        if graphics_item is not None:
+            bounds = bounds.united(graphics_item.sceneBoundingRect())
+        return bounds.intersects(visible_rect)
+    
+    def _flush_dirty_connections(self, *args):
+        """更新已进入视口的待更新连接"""
+        if not self._dirty_connections:
+            return
+        
+        visible_rect = self._visible_scene_rect()
+        visible_items = []
+        for connection_id in list(self._dirty_connections):
+            graphics_item = self.connection_graphics.get(connection_id)
+            if graphics_item is None:
+                self._dirty_connections.discard(connection_id)
+                continue
+            
+            connection = graphics_item.get_connection()
+            if self._connection_visible(connection, visible_rect):
+                self._dirty_connections.discard(connection_id)
+                visible_items.append(graphics_item)
+        ConnectionGraphicsItem.flush_dirty(visible_items)
+    
+    def showEvent(self, event):
+        """显示事件"""
+        super().showEvent(event)
+        self._flush_dirty_connections()
+    
+    def resizeEvent(self, event):
+        """尺寸变化事件"""
+        super().resizeEvent(event)
+        self._flush_dirty_connections()
+    
     def wheelEvent(self, event: QWheelEvent):
         """鼠标滚轮事件（缩放）"""
         # 缩放因子
@@ -211,6 +416,8 @@ class WorkflowCanvas(QGraphicsView):
         else:
             # 向下滚动，缩小
             self.scale(1.0 / scale_factor, 1.0 / scale_factor)
+        
+        self._flush_dirty_connections()
     
     def mousePressEvent(self, event: QMouseEvent):
         """鼠标按下事件"""
@@ -218,11 +425,11 @@ class WorkflowCanvas(QGraphicsView):
         
         if event.button() == Qt.LeftButton:
             # 检查是否点击在端口上
-            item = self.scene.itemAt(scene_pos, self.transform())
+            port_item = self._port_item_at(scene_pos)
             
-            if hasattr(item, 'get_port'):
+            if port_item is not None:
                 # 开始创建连接
-                self.start_connection(item)
+                self.start_connection(port_item)
                 return
             
             # 发送画布点击信号
@@ -238,12 +445,19 @@ class WorkflowCanvas(QGraphicsView):
     def mouseMoveEvent(self, event: QMouseEvent):
         """鼠标移动事件"""
         if self.creating_connection and self.temp_connection:
-            # 更新临时连接
-            scene_pos = self.mapToScene(event.pos())
-            self.temp_connection.set_target_pos(scene_pos)
+            # 更新临时连接（合并到下一次定时器触发）
+            self._pending_target_pos = self.mapToScene(event.pos())
+            if not self._temp_update_timer.isActive():
+                self._temp_update_timer.start()
         
         super().mouseMoveEvent(event)
     
+    def _apply_pending_target_pos(self):
+        """将最近一次鼠标位置应用到临时连接"""
+        if self.temp_connection and self._pending_target_pos is not None:
+            self.temp_connection.set_target_pos(self._pending_target_pos)
+        self._pending_target_pos = None
+    
     def mouseReleaseEvent(self, event: QMouseEvent):
         """鼠标释放事件"""
         if event.button() == Qt.LeftButton and self.creating_connection:
@@ -273,6 +487,13 @@ class WorkflowCanvas(QGraphicsView):
         
         super().keyPressEvent(event)
     
+    def _port_item_at(self, scene_pos: QPointF) -> Optional[QGraphicsItem]:
+        """返回指定场景位置处最上层的端口图形项（按身份在端口表中查找）"""
+        for item in self.scene.items(scene_pos):
+            if item in self._port_items:
+                return item
+        return None
+    
     def start_connection(self, port_item):
         """开始创建连接"""
         self.creating_connection = True
@@ -291,11 +512,11 @@ class WorkflowCanvas(QGraphicsView):
             return
         
         # 查找目标端口
-        target_item = self.scene.itemAt(target_pos, self.transform())
+        target_item = self._port_item_at(target_pos)
         
-        if hasattr(target_item, 'get_port'):
-            source_port = self.connection_start_port.get_port()
-            target_port = target_item.get_port()
+        if target_item is not None:
+            source_port = self._port_items[self.connection_start_port]
+            target_port = self._port_items[target_item]
             
             # 检查连接是否有效
             if self.can_create_connection(source_port, target_port):
@@ -305,6 +526,8 @@ class WorkflowCanvas(QGraphicsView):
     
     def cancel_connection(self):
         """取消连接创建"""
+        self._temp_update_timer.stop()
+        self._pending_target_pos = None
         if self.temp_connection:
             self.scene.removeItem(self.temp_connection)
             self.temp_connection = None
@@ -348,77 +571,54 @@ class WorkflowCanvas(QGraphicsView):
         except Exception as e:
             QMessageBox.warning(self, "连接创建失败", str(e))
     
+    def setup_context_menus(self):
+        """预先创建节点/连接/画布三种右键菜单，动作只连接一次"""
+        # 当前菜单作用的节点或连接，以及画布菜单的场景位置
+        self._menu_target = None
+        self._menu_scene_pos = QPointF()
+        
+        # 节点菜单
+        self._node_menu = QMenu(self)
+        self._node_menu.addAction("执行节点", lambda: self.execute_node(self._menu_target))
+        self._node_menu.addSeparator()
+        self._node_menu.addAction("复制", lambda: self.copy_node(self._menu_target))
+        self._node_menu.addAction("删除", lambda: self.delete_node(self._menu_target))
+        self._node_menu.addSeparator()
+        self._node_menu.addAction("属性", lambda: self.show_node_properties(self._menu_target))
+        
+        # 连接菜单
+        self._conn_menu = QMenu(self)
+        self._conn_menu.addAction("删除连接", lambda: self.delete_connection(self._menu_target))
+        
+        # 画布菜单（粘贴项仅在剪贴板非空时显示）
+        self._canvas_menu = QMenu(self)
+        self._paste_action = self._canvas_menu.addAction(
+            "粘贴", lambda: self.paste_nodes(self._menu_scene_pos))
+        self._canvas_menu.addSeparator()
+        self._canvas_menu.addAction("全选", self.select_all_nodes)
+        self._canvas_menu.addAction("清空选择", self.clear_selection)
+    
     def show_context_menu(self, pos: QPoint, scene_pos: QPointF):
         """显示右键菜单"""
-        menu = QMenu(self)
-        
         # 获取点击的项目
         item = self.scene.itemAt(scene_pos, self.transform())
         
         if isinstance(item, NodeGraphicsItem):
             # 节点菜单
-            self.add_node_menu_actions(menu, item.get_node())
+            self._menu_target = item.get_node()
+            menu = self._node_menu
         elif isinstance(item, ConnectionGraphicsItem):
             # 连接菜单
-            self.add_connection_menu_actions(menu, item.get_connection())
+            self._menu_target = item.get_connection()
+            menu = self._conn_menu
         else:
             # 画布菜单
-            self.add_canvas_menu_actions(menu, scene_pos)
-        
-        if not menu.isEmpty():
-            menu.exec_(self.mapToGlobal(pos))
-    
-    def add_node_menu_actions(self, menu: QMenu, node: BaseNode):
-        """添加节点菜单项"""
-        # 执行节点
-        execute_action = QAction("执行节点", self)
-        execute_action.triggered.connect(lambda: self.execute_node(node))
-        menu.addAction(execute_action)
-        
-        menu.addSeparator()
-        
-        # 复制/删除
-        copy_action = QAction("复制", self)
-        copy_action.triggered.connect(lambda: self.copy_node(node))
-        menu.addAction(copy_action)
-        
-        delete_action = QAction("删除", self)
-        delete_action.triggered.connect(lambda: self.delete_node(node))
-        menu.addAction(delete_action)
-        
-        menu.addSeparator()
-        
-        # 属性
-        properties_action = QAction("属性", self)
-        properties_action.triggered.connect(lambda: self.show_node_properties(node))
-        menu.addAction(properties_action)
-    
-    def add_connection_menu_actions(self, menu: QMenu, connection: Connection):
-        """添加连接菜单项"""
-        # 删除连接
-        delete_action = QAction("删除连接", self)
-        delete_action.triggered.connect(lambda: self.delete_connection(connection))
-        menu.addAction(delete_action)
-    
-    def add_canvas_menu_actions(self, menu: QMenu, scene_pos: QPointF):
-        """添加画布菜单项"""
-        # 粘贴
-        if hasattr(self, 'clipboard_nodes') and self.clipboard_nodes:
-            paste_action = QAction("粘贴", self)
-            paste_action.triggered.connect(lambda: self.paste_nodes(scene_pos))
-            menu.addAction(paste_action)
-        
-        menu.addSeparator()
-        
-        # 全选
-        select_all_action = QAction("全选", self)
-        select_all_action.triggered.connect(self.select_all_nodes)
-        menu.addAction(select_all_action)
-        
-        # 清空选择
-        clear_selection_action = QAction("清空选择", self)
-        clear_selection_action.triggered.connect(self.clear_selection)
-        menu.addAction(clear_selection_action)
+            self._menu_target = None
+            self._menu_scene_pos = scene_pos
+            self._paste_action.setVisible(bool(getattr(self, 'clipboard_nodes', None)))
+            menu = self._canvas_menu
+        
+        menu.exec_(self.mapToGlobal(pos))
     
     def execute_node(self, node: BaseNode):
         """执行节点"""
@@ -459,8 +659,15 @@ class WorkflowCanvas(QGraphicsView):
     
     def select_all_nodes(self):
         """全选节点"""
-        for graphics_item in self.node_graphics.values():
-            graphics_item.setSelected(True)
+        # 逐个选中时屏蔽场景的selectionChanged，避免每选中一个节点就重新扫描一次选择集
+        self.scene.blockSignals(True)
+        try:
+            for graphics_item in self.node_graphics.values():
+                graphics_item.setSelected(True)
+        finally:
+            self.scene.blockSignals(False)
+        
+        self.selection_changed.emit([item.get_node() for item in self.node_graphics.values()])
     
     def clear_selection(self):
         """清空选择"""
@@ -490,11 +697,9 @@ class WorkflowCanvas(QGraphicsView):
     
     def on_node_position_changed(self, node: BaseNode):
         """节点位置变化处理"""
-        # 更新相关连接
-        if self.workflow:
-            for connection in self.workflow.get_connections():
-                if connection.source_node == node or connection.target_node == node:
-                    self.update_connection_graphics(connection)
+        # 只标记该节点的相邻连接，路径在下一轮事件循环中统一重建
+        for connection in self._node_to_connections.get(node.id, ()):
+            self.update_connection_graphics(connection)
     
     def on_node_selection_changed(self, node: BaseNode, selected: bool):
         """节点选择状态变化处理"""
@@ -519,12 +724,14 @@ class WorkflowCanvas(QGraphicsView):
         """缩放到选中项目"""
         selected_items = self.scene.selectedItems()
         if selected_items:
-            # 计算选中项目的边界
-            rect = QRectF()
-            for item in selected_items:
-                rect = rect.united(item.sceneBoundingRect())
+            # 计算选中项目的边界：用浮点数的min/max合并，避免每步构造QRectF
+            rects = [item.sceneBoundingRect() for item in selected_items]
+            left = min(r.left() for r in rects)
+            top = min(r.top() for r in rects)
+            right = max(r.right() for r in rects)
+            bottom = max(r.bottom() for r in rects)
             
-            self.fitInView(rect, Qt.KeepAspectRatio)
+            self.fitInView(QRectF(left, top, right - left, bottom - top), Qt.KeepAspectRatio)
     
     def set_zoom(self, zoom_level: float):
         """设置缩放级别"""
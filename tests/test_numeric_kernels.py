@@ -0,0 +1,106 @@
+"""
+数值计算内核测试
+
+覆盖退化输入（完全共线、杠杆值为1、残差全为0）下numba内核与NumPy回退的一致性
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("pandas")
+
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from nodes.visualization import numeric_kernels  # noqa: E402
+
+
+@pytest.fixture(params=[True, False], ids=["numba", "numpy"])
+def kernels(request, monkeypatch):
+    """分别在numba内核与NumPy回退两条路径下运行"""
+    if request.param and not numeric_kernels.NUMBA_AVAILABLE:
+        pytest.skip("numba未安装")
+    monkeypatch.setattr(numeric_kernels, "NUMBA_AVAILABLE", request.param)
+    return numeric_kernels
+
+
+def test_regression_diagnostics_collinear(kernels):
+    """完全共线时不抛异常，标准化残差为非有限值，R²为1"""
+    x = np.array([0.0, 1.0, 2.0, 3.0])
+    y = 2.0 * x + 1.0
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        fitted, residuals, std_residuals, leverages, slope, intercept, r_squared = \
+            kernels.regression_diagnostics(x, y)
+
+    assert slope == pytest.approx(2.0)
+    assert intercept == pytest.approx(1.0)
+    np.testing.assert_allclose(fitted, y)
+    np.testing.assert_allclose(residuals, 0.0, atol=1e-12)
+    assert not np.isfinite(std_residuals).any()
+    np.testing.assert_allclose(leverages.sum(), 2.0)
+    assert r_squared == pytest.approx(1.0)
+
+
+def test_cooks_distance_degenerate(kernels):
+    """MSE为0或杠杆值为1时返回inf/NaN而不是抛出ZeroDivisionError"""
+    residuals = np.array([1.0, 0.0, 0.5])
+    leverages = np.array([1.0, 0.5, 0.5])
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        unit_leverage = kernels.cooks_distance(residuals, leverages, 2, 1.0)
+        zero_mse = kernels.cooks_distance(residuals, leverages, 2, 0.0)
+
+    assert np.isinf(unit_leverage[0])
+    assert unit_leverage[1] == 0.0
+    assert not np.isfinite(zero_mse[[0, 2]]).any()
+
+
+def test_durbin_watson_zero_residuals(kernels):
+    """残差全为0时返回NaN"""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        assert np.isnan(kernels.durbin_watson(np.zeros(4)))
+
+
+def test_fast_corr_degenerate_pairs():
+    """常数列与成对有效样本少于2的列对与 DataFrame.corr 一致返回NaN"""
+    pd = pytest.importorskip("pandas")
+    df = pd.DataFrame({
+        "a": [1.0, 2.0, 3.0, 4.0],
+        "b": [2.0, 4.0, 6.0, 9.0],
+        "const": [5.0, 5.0, 5.0, 5.0],
+        "left": [1.0, 2.0, np.nan, np.nan],
+        "right": [np.nan, 3.0, 4.0, np.nan],
+    })
+
+    result = numeric_kernels.fast_corr(df)
+
+    assert result.loc["a", "b"] == pytest.approx(df["a"].corr(df["b"]))
+    assert result[["const"]].isna().all().all()
+    assert result.loc[["const"]].isna().all().all()
+    assert np.isnan(result.loc["left", "right"])
+
+
+def test_fast_corr_matches_pandas_with_missing_values():
+    """含缺失值时与 DataFrame.corr 的成对计算结果一致"""
+    pd = pytest.importorskip("pandas")
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(rng.normal(size=(200, 4)), columns=list("abcd"))
+    df.loc[rng.choice(200, 60, replace=False), "b"] = np.nan
+    df.loc[rng.choice(200, 150, replace=False), "c"] = np.nan
+    df["d"] = df["a"] * 0.5 + rng.normal(scale=0.1, size=200)
+
+    pd.testing.assert_frame_equal(numeric_kernels.fast_corr(df), df.corr())
+
+
+def test_fast_corr_matches_pandas_without_missing_values():
+    """无缺失值时GEMM路径与 DataFrame.corr 一致"""
+    pd = pytest.importorskip("pandas")
+    rng = np.random.default_rng(1)
+    df = pd.DataFrame(rng.normal(size=(500, 5)), columns=list("abcde"))
+
+    pd.testing.assert_frame_equal(numeric_kernels.fast_corr(df), df.corr(), atol=1e-12)